@@ -1 +1,9 @@
 from . import models
+
+
+def uninstall_hook(env):
+    """Remove the triggers maintaining the materialized usage counters"""
+    usages = env['field.access.config.usage'].with_context(active_test=False).search([
+        ('materialized', '=', True),
+    ])
+    usages._drop_usage_counter()
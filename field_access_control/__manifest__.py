@@ -22,16 +22,20 @@ Key Features:
     "license": "LGPL-3",
     "depends": [
         "base",
+        "web",
         "product",
         "sale_management",
         "purchase",
     ],
     "data": [
         "security/ir.model.access.csv",
+        "data/ir_cron_data.xml",
         "views/field_access_config_views.xml",
+        "views/field_access_stats_views.xml",
         "views/menu_views.xml",
     ],
     "images": ["static/description/icon.png"],
+    "uninstall_hook": "uninstall_hook",
     "installable": True,
     "application": False,
     "auto_install": False,
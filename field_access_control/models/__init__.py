@@ -1,3 +1,5 @@
 from . import base_model_override
 from . import field_access_config
-from . import ir_ui_view
\ No newline at end of file
+from . import field_access_stats
+from . import field_access_usage_counter
+from . import ir_ui_view
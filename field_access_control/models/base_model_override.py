@@ -1,48 +1,105 @@
-from odoo import models, api, _
-from odoo.exceptions import UserError, AccessError
+from collections import defaultdict
+
+from odoo import models, api, Command, _
+from odoo.exceptions import UserError
+from odoo.models import fix_import_export_id_paths
+from odoo.tools import SQL
+
+from . import field_access_stats
+from .field_access_config import UsageSpec
+
+# Maximum number of offending records listed in a usage error message
+USAGE_ERROR_RECORD_LIMIT = 20
+# Default cap of the usage counts shown in error messages, overridden by the
+# "field_access_control.usage_count_limit" system parameter (0 hides counts)
+USAGE_COUNT_LIMIT = 1000
+# Key of the transaction-local memo {usage spec id: set of unused target ids, or
+# None when not memoized anymore} in cr.postcommit.data, which lasts until the
+# transaction commits or rolls back (cr.precommit.data is reset on every flush)
+USAGE_MEMO_KEY = 'field_access_control.usage_memo'
+# Key of the usage checks postponed by the "field_access_defer" context key in
+# cr.postcommit.data {token: {(model name, operation): (ids, specs, fields)}},
+# the token of the current checks being held in cr.precommit.data
+DEFERRED_KEY = 'field_access_control.deferred'
 
 
 class BaseModel(models.AbstractModel):
     _inherit = 'base'
 
+    # -------------------------------
+    # CREATE
+    # -------------------------------
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to forget the memoized usage of the usage models"""
+
+        self._invalidate_field_access_usage_memo()
+        return super().create(vals_list)
+
+    def web_save(self, vals, specification, next_id=None):
+        """
+        Prevent setting restricted fields from the web client, on creation and
+        in the records created through x2many commands.
+
+        Only the values sent by the client are checked here, at the entry:
+        create() overrides add values of their own (sequences, computed
+        defaults) before reaching base, which are not set by the user.
+        """
+        if self:
+            restricted_fields = self._check_field_access_commands([vals])
+        else:
+            with field_access_stats.measure(self.env, self._name, 'create'):
+                restricted_fields = self._check_field_access_create([vals])
+        # the values left out are not taken from the client context either
+        records = self._field_access_without_defaults(restricted_fields)
+        return super(BaseModel, records).web_save(vals, specification, next_id=next_id)
+
+    def load(self, fields, data):
+        """Prevent importing restricted fields, of this model or of the x2many lines it creates"""
+        restricted_fields = self._check_field_access_import(fields)
+        records = self._field_access_without_defaults(restricted_fields)
+        return super(BaseModel, records).load(fields, data)
+
     # -------------------------------
     # WRITE
     # -------------------------------
     def write(self, vals):
         """Override write to prevent updates based on configuration"""
 
-        # Skip for system admins
-        if self.env.user.has_group('base.group_system'):
-            return super().write(vals)
+        self._invalidate_field_access_usage_memo(volatile=True)
 
-        # Get related access configurations
-        configs = self.env['field.access.config'].sudo().search([
-            ('active', '=', True),
-            ('model_name', '=', self._name)
-        ])
-
-        for config in configs:
-            if not config._check_user_affected(self.env.user):
-                continue
+        # Fast path: the model has no active configuration at all
+        if not self._is_field_access_protected():
+            return super().write(vals)
 
-            # Fully prevent write
-            if config.prevent_write:
-                raise UserError(_(
-                    'You are not allowed to update records of type "%s" due to access restrictions.'
-                ) % self._description)
+        with field_access_stats.measure(self.env, self._name, 'write'):
+            policy = self._get_field_access_policy()
+            if policy:
+                # Fully prevent write
+                if policy.prevent_write:
+                    raise UserError(_(
+                        'You are not allowed to update records of type "%s" due to access restrictions.'
+                    ) % self._description)
 
-            # Check restricted fields
-            for line in config.field_line_ids:
-                if line.field_name in vals and line.access_type in ['readonly', 'hidden']:
+                # Check restricted fields
+                for field_name in policy.restricted_fields.intersection(vals):
                     raise UserError(_(
                         'You are not allowed to modify the field "%s" in "%s".'
-                    ) % (line.field_description or line.field_name, self._description))
-
-            # Check usage restriction
-            if config.check_usage and config.usage_model_ids:
-                for usage in config.usage_model_ids:
-                    if usage.prevent_update_if_used:
-                        self._check_record_usage(usage, 'update')
+                    ) % (self._field_access_label(field_name), self._description))
+
+                # Check usage restriction, only when guarded values really change
+                usage_specs = [usage for usage in policy.usage_specs if usage.prevent_update]
+                changed_fields = self._get_field_access_changed_fields(vals) if usage_specs else set()
+                if changed_fields:
+                    guarded_fields = set()
+                    for usage in list(usage_specs):
+                        changed_guarded = changed_fields & usage.guarded_fields if usage.guarded_fields else changed_fields
+                        if changed_guarded:
+                            guarded_fields |= changed_guarded
+                        else:
+                            usage_specs.remove(usage)
+                    if usage_specs:
+                        self._check_record_usage(usage_specs, 'update', restricted_fields=guarded_fields)
 
         return super().write(vals)
 
@@ -52,30 +109,24 @@ class BaseModel(models.AbstractModel):
     def unlink(self):
         """Override unlink to prevent deletion based on configuration"""
 
-        # Skip for system admins
-        if self.env.user.has_group('base.group_system'):
-            return super().unlink()
-
-        configs = self.env['field.access.config'].sudo().search([
-            ('active', '=', True),
-            ('model_name', '=', self._name)
-        ])
+        self._invalidate_field_access_usage_memo(volatile=True)
 
-        for config in configs:
-            if not config._check_user_affected(self.env.user):
-                continue
+        if not self._is_field_access_protected():
+            return super().unlink()
 
-            # Prevent delete entirely
-            if config.prevent_delete:
-                raise UserError(_(
-                    'You are not allowed to delete records of type "%s" due to access restrictions.'
-                ) % self._description)
+        with field_access_stats.measure(self.env, self._name, 'unlink'):
+            policy = self._get_field_access_policy()
+            if policy:
+                # Prevent delete entirely
+                if policy.prevent_delete:
+                    raise UserError(_(
+                        'You are not allowed to delete records of type "%s" due to access restrictions.'
+                    ) % self._description)
 
-            # Check if record is used elsewhere
-            if config.check_usage and config.usage_model_ids:
-                for usage in config.usage_model_ids:
-                    if usage.prevent_delete_if_used:
-                        self._check_record_usage(usage, 'delete')
+                # Check if record is used elsewhere
+                usage_specs = [usage for usage in policy.usage_specs if usage.prevent_delete]
+                if usage_specs:
+                    self._check_record_usage(usage_specs, 'delete')
 
         return super().unlink()
 
@@ -85,96 +136,567 @@ class BaseModel(models.AbstractModel):
     def copy(self, default=None):
         """Override copy to prevent duplication based on usage"""
 
-        # Skip for system admins
-        if self.env.user.has_group('base.group_system'):
+        # Restricted fields are copied as is, but the values overriding them
+        # (or set on the lines created through x2many commands) are the caller's
+        restricted_fields = self._check_field_access_create([default]) if default else frozenset()
+
+        if not self._is_field_access_protected():
             return super().copy(default=default)
 
-        configs = self.env['field.access.config'].sudo().search([
-            ('active', '=', True),
-            ('model_name', '=', self._name)
-        ])
+        with field_access_stats.measure(self.env, self._name, 'copy'):
+            policy = self._get_field_access_policy()
+            if policy:
+                # Check if record is used elsewhere - prevent duplication if used
+                usage_specs = [usage for usage in policy.usage_specs if usage.prevent_duplicate]
+                if usage_specs:
+                    self._check_record_usage(usage_specs, 'duplicate')
+                restricted_fields |= policy.restricted_fields
 
-        for config in configs:
-            if not config._check_user_affected(self.env.user):
+        records = self._field_access_without_defaults(restricted_fields)
+        return super(BaseModel, records).copy(default=default).with_env(self.env)
+
+    @api.model
+    def _check_field_access_create(self, vals_list):
+        """
+        Check a whole create batch at once: the restricted fields set in any
+        row are found from the union of the keys, and every offending row is
+        reported. Any value is rejected, empty or not; the views make the
+        restricted fields readonly, so the client does not send them. The
+        records created through x2many commands are checked against the
+        policy of their own model.
+
+        :return: frozenset of the restricted fields of the created models,
+                 whose "default_" context keys must not apply
+        """
+        restricted_fields = frozenset()
+        policy = self._get_field_access_policy()
+        if policy and policy.restricted_fields:
+            restricted_fields = policy.restricted_fields
+            field_names = restricted_fields.intersection(set().union(*vals_list))
+            if field_names:
+                offending = defaultdict(list)
+                for row, vals in enumerate(vals_list, start=1):
+                    for field_name in field_names.intersection(vals):
+                        offending[field_name].append(row)
+
+                lines = []
+                for field_name, rows in offending.items():
+                    rows_text = ', '.join(map(str, rows[:USAGE_ERROR_RECORD_LIMIT]))
+                    if len(rows) > USAGE_ERROR_RECORD_LIMIT:
+                        rows_text += ', ...'
+                    lines.append(_('- "%(field)s" (rows: %(rows)s)') % {
+                        'field': self._field_access_label(field_name),
+                        'rows': rows_text,
+                    })
+
+                raise UserError(_(
+                    'You are not allowed to set the following fields when creating "%(model)s":\n%(fields)s'
+                ) % {
+                    'model': self._description,
+                    'fields': '\n'.join(lines),
+                })
+
+        return restricted_fields | self._check_field_access_commands(vals_list)
+
+    @api.model
+    def _check_field_access_commands(self, vals_list):
+        """
+        Check the records created through the x2many commands of ``vals_list``
+        (see _check_field_access_create). The records updated through them
+        are checked by write().
+        """
+        restricted_fields = frozenset()
+        for field_name in set().union(*vals_list):
+            field = self._fields.get(field_name)
+            if field is None or field.type not in ('one2many', 'many2many'):
                 continue
+            created_vals_list = [
+                command[2]
+                for vals in vals_list
+                for command in vals.get(field_name) or ()
+                if isinstance(command, (list, tuple)) and command and command[0] == Command.CREATE
+            ]
+            if created_vals_list:
+                restricted_fields |= self.env[field.comodel_name]._check_field_access_create(created_vals_list)
+        return restricted_fields
+
+    @api.model
+    def _check_field_access_import(self, fields):
+        """
+        Check the columns of an import (see load()): restricted fields cannot
+        be imported, nor those of the x2many lines created by the import.
 
-            # Check if record is used elsewhere - prevent duplication if used
-            if config.check_usage and config.usage_model_ids:
-                for usage in config.usage_model_ids:
-                    if usage.prevent_duplicate_if_used:
-                        self._check_record_usage(usage, 'duplicate')
+        :return: frozenset of the restricted fields of the imported models,
+                 whose "default_" context keys must not apply
+        """
+        imported = set()
+        line_paths = defaultdict(list)
+        for path in fields:
+            if not path:
+                continue
+            field_name, *subpath = fix_import_export_id_paths(path)
+            field = self._fields.get(field_name)
+            if field is not None and field.type in ('one2many', 'many2many') \
+                    and subpath and subpath[0] not in ('id', '.id'):
+                line_paths[field.comodel_name].append('/'.join(subpath))
+            else:
+                imported.add(field_name)
+
+        restricted_fields = frozenset()
+        policy = self._get_field_access_policy()
+        if policy and policy.restricted_fields:
+            restricted_fields = policy.restricted_fields
+            field_names = restricted_fields & imported
+            if field_names:
+                raise UserError(_(
+                    'You are not allowed to import the following fields of "%(model)s": %(fields)s'
+                ) % {
+                    'model': self._description,
+                    'fields': ', '.join(self._field_access_label(field_name) for field_name in sorted(field_names)),
+                })
+
+        for comodel_name, paths in line_paths.items():
+            restricted_fields |= self.env[comodel_name]._check_field_access_import(paths)
+        return restricted_fields
+
+    def _field_access_without_defaults(self, restricted_fields):
+        """Return these records without the "default_" context keys of the restricted fields"""
+        context = self.env.context
+        keys = {'default_%s' % field_name for field_name in restricted_fields}.intersection(context)
+        if not keys:
+            return self
+        return self.with_context({key: value for key, value in context.items() if key not in keys})
+
+    def _get_field_access_changed_fields(self, vals):
+        """
+        Return the names of the fields in ``vals`` whose value differs from
+        the current value of at least one record. The current values come from
+        the record cache, fetched at once for the whole recordset if needed.
+        """
+        changed = set()
+        for field_name, value in vals.items():
+            field = self._fields.get(field_name)
+            if field is None or field.type in ('one2many', 'many2many', 'binary'):
+                # x2many commands and binaries are not compared
+                changed.add(field_name)
+                continue
+            for record in self:
+                try:
+                    new_value = field.convert_to_record(field.convert_to_cache(value, record), record)
+                except (ValueError, TypeError):
+                    changed.add(field_name)
+                    break
+                if new_value != record[field_name]:
+                    changed.add(field_name)
+                    break
+        return changed
 
-        return super().copy(default=default)
+    # -------------------------------
+    # VIEWS (Field Restrictions)
+    # -------------------------------
+    @api.model
+    def _get_view(self, view_id=None, view_type='form', **options):
+        """Apply the field restrictions of the current user to the view arch"""
+        arch, view = super()._get_view(view_id, view_type, **options)
+        with field_access_stats.measure(self.env, self._name, 'view'):
+            self.env['ir.ui.view']._apply_field_access_attrs(arch, self._name)
+        return arch, view
+
+    @api.model
+    def _get_view_cache_key(self, view_id=None, view_type='form', **options):
+        """Cache the restricted views per set of restrictions, like unrestricted ones"""
+        key = super()._get_view_cache_key(view_id, view_type, **options)
+        return key + (self.env['field.access.config']._get_user_restrictions(),)
+
+    # -------------------------------
+    # HELPERS
+    # -------------------------------
+    def _is_field_access_protected(self):
+        """Check if this model has any active field access configuration"""
+        return self._name in self.env['field.access.config']._get_protected_models()
+
+    def _get_field_access_policy(self):
+        """Return the memoized EffectivePolicy of this model for the current user, or None"""
+        return self.env['field.access.config']._get_user_policy(self._name)
+
+    def _field_access_label(self, field_name):
+        """Return the user-facing label of a field of this model"""
+        field = self._fields.get(field_name)
+        return field._description_string(self.env) if field else field_name
+
+    def _field_access_count_limit(self):
+        """Return the cap of the usage counts reported to users (0 when counts are disabled)"""
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'field_access_control.usage_count_limit', USAGE_COUNT_LIMIT) or 0)
+
+    def _field_access_model_label(self, model_name):
+        """Return the user-facing name of a model, whatever the access rights"""
+        return self.env['ir.model']._get(model_name).sudo().name or model_name
 
     # -------------------------------
     # RECORD USAGE CHECKER (Access-Safe)
     # -------------------------------
-    def _check_record_usage(self, usage_config, operation='update', restricted_fields=None):
+    def _field_access_usage_probe(self, usage_model, field_name):
+        """
+        Return an SQL subquery selecting the rows of ``usage_model`` whose
+        ``field_name`` references ``target.id``, or None when the field is not
+        stored as a column or relation table. A row referencing itself (e.g.
+        the commercial partner of a company) is not a usage of it.
+        """
+        field_obj = usage_model._fields[field_name]
+        if not field_obj.store or field_obj.type not in ('many2one', 'many2many'):
+            return None
+
+        self_reference = field_obj.comodel_name == usage_model._name
+        usage_model.flush_model()
+        # _search() applies active_test; record rules do not apply in sudo
+        query = usage_model._search([])
+        if field_obj.type == 'many2one':
+            query.add_where(SQL("%s = target.id", SQL.identifier(query.table, field_name)))
+            if self_reference:
+                query.add_where(SQL("%s <> target.id", SQL.identifier(query.table, 'id')))
+            return query.subselect(SQL('1'))
+
+        relation_column = SQL.identifier(field_obj.relation, field_obj.column1)
+        return SQL(
+            "SELECT 1 FROM %s WHERE %s = target.id AND %s IN %s%s",
+            SQL.identifier(field_obj.relation),
+            SQL.identifier(field_obj.relation, field_obj.column2),
+            relation_column,
+            query.subselect(),
+            SQL(" AND %s <> target.id", relation_column) if self_reference else SQL(),
+        )
+
+    def _field_access_used_ids(self, spec, target_ids, count_limit=0):
+        """
+        Return {target id: count} for the target ids used in the usage model
+        of ``spec``.
+
+        Without ``count_limit`` only existence is probed (EXISTS, so the common
+        "not used" path is an index probe) and counts are None; otherwise
+        counts are computed but stop at ``count_limit``. Materialized specs
+        read both from their counter table.
+        """
+        if spec.materialized:
+            # pending updates of the usage model only reach the counters (by trigger) once flushed
+            self.env[spec.usage_model].flush_model()
+            counts = self.env['field.access.usage.counter'].sudo()._get_used_counts(spec.id, target_ids)
+            if not count_limit:
+                return dict.fromkeys(counts)
+            return {target_id: min(count, count_limit) for target_id, count in counts.items()}
+
+        usage_model = self.env[spec.usage_model].sudo()
+        field_name = spec.field_name
+        probe = self._field_access_usage_probe(usage_model, field_name)
+        if probe is None:
+            # Fall back on the ORM for non-stored (searchable) fields, without counts
+            domain = [(field_name, 'in', list(target_ids))]
+            return dict.fromkeys(usage_model.search(domain).mapped(field_name).ids)
+
+        if count_limit:
+            self.env.cr.execute(SQL(
+                "SELECT target.id, (SELECT count(*) FROM (%s LIMIT %s) AS capped)"
+                " FROM unnest(%s::int[]) AS target(id)",
+                probe, count_limit, list(target_ids),
+            ))
+            return {target_id: count for target_id, count in self.env.cr.fetchall() if count}
+
+        self.env.cr.execute(self._field_access_usage_branch(spec, target_ids))
+        return dict.fromkeys(target_id for _spec_id, target_id in self.env.cr.fetchall())
+
+    def _field_access_usage_branch(self, spec, target_ids):
+        """
+        Return an SQL query selecting the (spec id, target id) of the target
+        ids used in the usage model of ``spec``, or None when the relation is
+        not stored as a column or relation table.
+        """
+        if spec.materialized:
+            self.env[spec.usage_model].flush_model()
+            Counter = self.env['field.access.usage.counter']
+            return SQL(
+                "SELECT %s, res_id FROM %s WHERE usage_id = %s AND res_id = ANY(%s) AND usage_count > 0",
+                spec.id, SQL.identifier(Counter._table), spec.id, list(target_ids),
+            )
+
+        probe = self._field_access_usage_probe(self.env[spec.usage_model].sudo(), spec.field_name)
+        if probe is None:
+            return None
+        return SQL(
+            "SELECT %s, target.id FROM unnest(%s::int[]) AS target(id) WHERE EXISTS(%s)",
+            spec.id, list(target_ids), probe,
+        )
+
+    def _field_access_used_ids_memo(self, spec_targets):
+        """
+        Return {spec id: {used target id: None}} for a list of (UsageSpec,
+        target ids). Only the target ids not known as unused yet in the
+        current transaction are probed, all the specs at once in a single
+        UNION ALL query of EXISTS probes.
+
+        Only unused target ids are memoized: a target found used inside a
+        savepoint may be unused again once it is rolled back.
+        """
+        memo_data = self.env.cr.postcommit.data.setdefault(USAGE_MEMO_KEY, {})
+        pending = []
+        branches = []
+        found = set()
+        for spec, target_ids in spec_targets:
+            unused = memo_data.setdefault(spec.id, set())
+            unknown_ids = [
+                target_id for target_id in target_ids
+                if unused is None or target_id not in unused
+            ]
+            field_access_stats.count_cache(
+                self.env, 'usage_memo', lookups=len(target_ids), misses=len(unknown_ids))
+            if not unknown_ids:
+                continue
+            pending.append((spec, unused, unknown_ids))
+            branch = self._field_access_usage_branch(spec, unknown_ids)
+            if branch is None:
+                found.update((spec.id, target_id) for target_id in self._field_access_used_ids(spec, unknown_ids))
+            else:
+                branches.append(branch)
+
+        if branches:
+            self.env.cr.execute(SQL(" UNION ALL ").join(branches))
+            found.update(self.env.cr.fetchall())
+
+        for spec, unused, unknown_ids in pending:
+            if unused is not None:
+                unused.update(target_id for target_id in unknown_ids if (spec.id, target_id) not in found)
+
+        return {
+            spec.id: dict.fromkeys(
+                target_id for target_id in target_ids if (spec.id, target_id) in found)
+            for spec, target_ids in spec_targets
+        }
+
+    def _invalidate_field_access_usage_memo(self, volatile=False):
         """
-        Check if records are being used in other models and prevent operation
+        Forget the memoized usage read from this model, which is being modified.
 
-        :param usage_config: field.access.config.usage record
+        Usage rows written or deleted inside a savepoint come back when it is
+        rolled back, so with ``volatile`` (write, unlink) the usage read from
+        this model is not memoized anymore for the rest of the transaction.
+        """
+        spec_ids = self.env['field.access.config']._get_usage_model_specs().get(self._name)
+        if not spec_ids:
+            return
+        if volatile:
+            memo_data = self.env.cr.postcommit.data.setdefault(USAGE_MEMO_KEY, {})
+            memo_data.update(dict.fromkeys(spec_ids))
+            return
+        memo_data = self.env.cr.postcommit.data.get(USAGE_MEMO_KEY)
+        if not memo_data:
+            return
+        for spec_id in spec_ids:
+            if memo_data.get(spec_id):
+                memo_data[spec_id] = set()
+
+    def _field_access_expand_targets(self, comodel_name, delegate_field):
+        """
+        Return {delegated record id: record id} of the records of
+        ``comodel_name`` linked to these records by ``delegate_field``, in a
+        single query for the whole recordset (archived ones included).
+        """
+        comodel = self.env[comodel_name].sudo().with_context(active_test=False)
+        return {
+            delegated_id: record.id
+            for record, delegated_ids in comodel._read_group(
+                [(delegate_field, 'in', self.ids)], [delegate_field], ['id:array_agg'])
+            for delegated_id in delegated_ids
+        }
+
+    def _get_record_usage(self, usage_specs, count_limit=0):
+        """
+        Return where the records are used. Existence is checked for all the
+        usage models in one query; counts take one query per usage model.
+
+        :param usage_specs: iterable of compiled UsageSpec
+        :param count_limit: 0 to only probe existence (counts are None),
+                            otherwise the cap of the returned usage counts
+        :return: dict {record id: [(UsageSpec, count), ...]} holding the used records only
+        """
+        usage = defaultdict(list)
+        if not self:
+            return usage
+
+        # {(comodel, delegate field): {target id: record id}}, shared by the specs
+        target_maps = {}
+        spec_targets = []
+        for spec in usage_specs:
+            usage_model = self.env[spec.usage_model].sudo()
+            field_obj = usage_model._fields.get(spec.field_name)
+            if not field_obj:
+                continue
+
+            # target id looked up in the usage model -> record id
+            delegate_field = spec.delegate_field
+            # Special case for product templates → product variants
+            if not delegate_field and self._name == 'product.template' \
+                    and field_obj.comodel_name == 'product.product':
+                delegate_field = 'product_tmpl_id'
+            if delegate_field:
+                key = (field_obj.comodel_name, delegate_field)
+                if key not in target_maps:
+                    target_maps[key] = self._field_access_expand_targets(*key)
+                target_map = target_maps[key]
+                if not target_map:
+                    continue
+            else:
+                target_map = {record_id: record_id for record_id in self.ids}
+            spec_targets.append((spec, target_map))
+
+        if count_limit:
+            used = {
+                spec.id: self._field_access_used_ids(spec, target_map, count_limit)
+                for spec, target_map in spec_targets
+            }
+        else:
+            used = self._field_access_used_ids_memo(spec_targets)
+
+        for spec, target_map in spec_targets:
+            counts = {}
+            for target_id, count in used[spec.id].items():
+                if target_id not in target_map:
+                    continue
+                record_id = target_map[target_id]
+                if count is None or record_id not in counts:
+                    counts[record_id] = count
+                else:
+                    counts[record_id] = min((counts[record_id] or 0) + count, count_limit)
+
+            for record_id, count in counts.items():
+                usage[record_id].append((spec, count))
+
+        return usage
+
+    def _check_record_usage(self, usage_specs, operation='update', restricted_fields=None):
+        """
+        Check if records are being used in other models and prevent operation.
+        With the ``field_access_defer`` context key (bulk imports, mass edits),
+        updates and duplications are only checked once, before commit.
+
+        :param usage_specs: compiled UsageSpec(s) of field.access.config.usage records
         :param operation: 'update', 'delete', or 'duplicate'
         :param restricted_fields: set of field names being updated (only for 'update' operation)
         """
-        self.ensure_one()
+        if isinstance(usage_specs, UsageSpec):
+            usage_specs = [usage_specs]
+
+        # Deleted records cannot be checked afterwards, so deletion is never deferred
+        if operation != 'delete' and self.env.context.get('field_access_defer'):
+            self._defer_record_usage(usage_specs, operation, restricted_fields)
+            return
 
-        usage_model = self.env[usage_config.usage_model_name]
-        field_name = usage_config.relation_field_name
-        field_obj = usage_model._fields.get(field_name)
-        if not field_obj:
+        with field_access_stats.measure(self.env, self._name, 'usage_check'):
+            usage = self._get_record_usage(usage_specs)
+        if not usage:
             return
 
-        target_ids = self.ids
-        # Special case for product templates → product variants
-        if self._name == 'product.template' and field_obj.comodel_name == 'product.product':
-            variants = self.env['product.product'].sudo().search([('product_tmpl_id', 'in', self.ids)])
-            field_name = usage_config.relation_field_name
-            target_ids = variants.ids
-            if not target_ids:
-                return
-
-        # Count usage
-        domain = [(field_name, 'in', target_ids)]
-        usage_count = usage_model.sudo().search_count(domain)
-        if usage_count > 0:
-            # Safe access to usage model name
+        # Map operation to user-friendly text
+        operation_map = {
+            'update': _('update'),
+            'delete': _('delete'),
+            'duplicate': _('duplicate')
+        }
+        operation_text = operation_map.get(operation, operation)
+
+        # List the offending records with the models using them; counts are
+        # only computed now that the operation is blocked, and are capped
+        used_records = self.browse([record_id for record_id in self.ids if record_id in usage])
+        count_limit = self._field_access_count_limit()
+        if count_limit:
+            usage = used_records[:USAGE_ERROR_RECORD_LIMIT]._get_record_usage(usage_specs, count_limit)
+
+        def usage_label(spec, count):
+            label = self._field_access_model_label(spec.usage_model)
+            if not count:
+                return label
+            return '%s (%s%s)' % (label, count, '+' if count >= count_limit else '')
+
+        lines = []
+        for record in used_records[:USAGE_ERROR_RECORD_LIMIT]:
+            lines.append('- %s: %s' % (record.display_name, ', '.join(
+                usage_label(spec, count) for spec, count in usage[record.id]
+            )))
+        if len(used_records) > USAGE_ERROR_RECORD_LIMIT:
+            lines.append(_('... and %s more') % (len(used_records) - USAGE_ERROR_RECORD_LIMIT))
+
+        # Build error message
+        error_msg = _(
+            'Cannot %(operation)s %(count)s record(s) because they are being used in:\n'
+            '%(records)s'
+        ) % {
+            'operation': operation_text,
+            'count': len(used_records),
+            'records': '\n'.join(lines),
+        }
+
+        # Add information about which restricted fields are being updated
+        if operation == 'update' and restricted_fields:
+            field_labels = [self._field_access_label(field_name) for field_name in restricted_fields]
+            error_msg += _('\n\nRestricted fields being updated: %s') % ', '.join(field_labels)
+
+        # Raise UserError with appropriate message
+        raise UserError(error_msg)
+
+    # -------------------------------
+    # DEFERRED ENFORCEMENT (Bulk Operations)
+    # -------------------------------
+    def _defer_record_usage(self, usage_specs, operation, restricted_fields=None):
+        """
+        Postpone a usage check until the next flush, which runs the precommit
+        hooks (at the latest when the transaction commits), or until
+        _field_access_checkpoint() is called. Checks of the same model and
+        operation are merged, so they run once, set-based, over all records.
+
+        The checks are kept in cr.postcommit.data, which flushes leave alone,
+        under a token held in cr.precommit.data: rolling back a savepoint
+        resets the latter, which voids the checks deferred inside it.
+        """
+        cr = self.env.cr
+        token = cr.precommit.data.get(DEFERRED_KEY)
+        if token is None:
+            token = cr.precommit.data[DEFERRED_KEY] = object()
+            cr.precommit.add(self.env['field.access.config']._field_access_checkpoint)
+
+        deferred = cr.postcommit.data.setdefault(DEFERRED_KEY, {}).setdefault(token, {})
+        ids, specs, fields = deferred.setdefault((self._name, operation), (set(), {}, set()))
+        ids.update(self.ids)
+        specs.update((spec.id, spec) for spec in usage_specs)
+        fields.update(restricted_fields or ())
+
+    @api.model
+    def _field_access_checkpoint(self):
+        """
+        Run the usage checks deferred so far. The violations of all the models
+        are reported at once; raising makes the whole transaction roll back.
+
+        The checks are only forgotten once they pass: when the error is caught
+        (e.g. around a savepoint), they are run again at the next flush, and
+        at commit.
+        """
+        cr = self.env.cr
+        queue = cr.postcommit.data.get(DEFERRED_KEY)
+        if not queue:
+            return
+        token = cr.precommit.data.get(DEFERRED_KEY)
+        # the checks of other tokens were deferred in rolled back savepoints
+        deferred = queue.pop(token, None)
+        queue.clear()
+        if not deferred:
+            return
+
+        errors = []
+        for (model_name, operation), (ids, specs, fields) in deferred.items():
+            records = self.env[model_name].with_context(field_access_defer=False).browse(ids).exists()
             try:
-                usage_model_name = usage_config.usage_model_id.name
-            except AccessError:
-                usage_model_name = usage_config.usage_model_id.model or _("restricted model")
-
-            # Map operation to user-friendly text
-            operation_map = {
-                'update': _('update'),
-                'delete': _('delete'),
-                'duplicate': _('duplicate')
-            }
-            operation_text = operation_map.get(operation, operation)
-
-            # Build error message
-            error_msg = _(
-                'Cannot %(operation)s "%(record)s" because it is being used in:\n'
-                '%(usage_model)s\n\n'
-                'Total usage count: %(count)s'
-            ) % {
-                            'operation': operation_text,
-                            'record': self.display_name,
-                            'usage_model': usage_model_name,
-                            'count': usage_count
-                        }
-
-            # Add information about which restricted fields are being updated
-            if operation == 'update' and restricted_fields:
-                field_labels = []
-                for field_name in restricted_fields:
-                    field_obj = self._fields.get(field_name)
-                    if field_obj:
-                        field_labels.append(field_obj.string or field_name)
-                    else:
-                        field_labels.append(field_name)
-
-                error_msg += _('\n\nRestricted fields being updated: %s') % ', '.join(field_labels)
-
-            # Raise UserError with appropriate message
-            raise UserError(error_msg)
\ No newline at end of file
+                records._check_record_usage(list(specs.values()), operation, fields)
+            except UserError as error:
+                errors.append('%s:\n%s' % (records._description, error.args[0]))
+
+        if errors:
+            queue[token] = deferred
+            cr.precommit.add(self._field_access_checkpoint)
+            raise UserError('\n\n'.join(errors))
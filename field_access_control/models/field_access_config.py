@@ -1,9 +1,82 @@
-from odoo import models, fields, api, _
-from odoo.exceptions import UserError, ValidationError
+import logging
+from collections import defaultdict, namedtuple
+
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import AccessError, UserError, ValidationError
+from odoo.models import LOG_ACCESS_COLUMNS
+from odoo.tools import SQL, frozendict
+
+from . import field_access_stats
+
+_logger = logging.getLogger(__name__)
+
+
+# Immutable, registry-cached representation of the active configurations.
+UsageSpec = namedtuple('UsageSpec', [
+    'id', 'usage_model', 'field_name',
+    'prevent_update', 'prevent_delete', 'prevent_duplicate',
+    'materialized', 'guarded_fields', 'delegate_field',
+])
+
+
+class CompiledRule(namedtuple('CompiledRule', [
+    'config_id', 'apply_to', 'user_ids', 'group_ids',
+    'prevent_write', 'prevent_delete',
+    'readonly_fields', 'hidden_fields', 'usage_specs',
+])):
+    __slots__ = ()
+
+    @property
+    def restricted_fields(self):
+        return self.readonly_fields | self.hidden_fields
+
+    def affects(self, user_id, group_ids):
+        """Check if the user with the given groups is affected by this rule"""
+        if self.apply_to == 'all':
+            return True
+        elif self.apply_to == 'users':
+            return user_id in self.user_ids
+        elif self.apply_to == 'groups':
+            return not self.group_ids.isdisjoint(group_ids)
+        return False
+
+
+# Merged policy of all the rules of a model affecting one group fingerprint.
+class EffectivePolicy(namedtuple('EffectivePolicy', [
+    'config_ids', 'prevent_write', 'prevent_delete',
+    'readonly_fields', 'hidden_fields', 'usage_specs',
+])):
+    __slots__ = ()
+
+    @property
+    def restricted_fields(self):
+        return self.readonly_fields | self.hidden_fields
+
+
+class FieldAccessPolicyMixin(models.AbstractModel):
+    _name = 'field.access.policy.mixin'
+    _description = 'Field Access Policy Cache Invalidation'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
 
 
 class FieldAccessConfig(models.Model):
     _name = 'field.access.config'
+    _inherit = ['field.access.policy.mixin']
     _description = 'Field Access Configuration'
     _order = 'sequence, id'
 
@@ -48,6 +121,34 @@ class FieldAccessConfig(models.Model):
     check_usage = fields.Boolean(string='Check Usage Before Update/Delete',
                                  default=False,
                                  help='Prevent updates/deletes if record is used in specified models')
+    auto_detect_usage = fields.Boolean(string='Auto-Detect References',
+                                       help='Also check usage in every model referencing the target model '
+                                            'through a stored, non-computed many2one or many2many field '
+                                            '(owned records deleted with the target, creator and last editor '
+                                            'fields, and records referencing themselves excepted). Referenced '
+                                            'records are blocked for the operations selected below.')
+    auto_detect_prevent_update = fields.Boolean(string='Auto-Detected: Prevent Update',
+                                                help='Prevent updating records referenced by an auto-detected '
+                                                     'usage model')
+    auto_detect_prevent_delete = fields.Boolean(string='Auto-Detected: Prevent Delete', default=True,
+                                                help='Prevent deleting records referenced by an auto-detected '
+                                                     'usage model')
+    auto_detect_prevent_duplicate = fields.Boolean(string='Auto-Detected: Prevent Duplicate',
+                                                   help='Prevent duplicating records referenced by an '
+                                                        'auto-detected usage model')
+
+    has_unindexed_usage = fields.Boolean(string='Has Unindexed Usage Models',
+                                         compute='_compute_has_unindexed_usage')
+
+    @api.depends('usage_model_ids.index_state')
+    def _compute_has_unindexed_usage(self):
+        for record in self:
+            record.has_unindexed_usage = 'missing' in record.usage_model_ids.mapped('index_state')
+
+    def unlink(self):
+        # usage lines are removed by the database cascade, without their unlink()
+        self.usage_model_ids.filtered('materialized')._drop_usage_counter()
+        return super().unlink()
 
     @api.constrains('apply_to', 'user_ids', 'group_ids')
     def _check_access_configuration(self):
@@ -62,22 +163,326 @@ class FieldAccessConfig(models.Model):
         self.ensure_one()
 
         # System admins are never affected
-        if user.has_group('base.group_system'):
+        group_ids = self._get_group_fingerprint(user)
+        if self._is_system_fingerprint(group_ids):
             return False
 
-        if self.apply_to == 'all':
-            return True
-        elif self.apply_to == 'users':
-            return user.id in self.user_ids.ids
-        elif self.apply_to == 'groups':
-            user_groups = user.groups_id.ids
-            return bool(set(self.group_ids.ids) & set(user_groups))
+        return self._compile_rule().affects(user.id, group_ids)
 
-        return False
+    # -------------------------------
+    # COMPILED POLICY (registry cache)
+    # -------------------------------
+    @api.model
+    @tools.ormcache('model_name')
+    def _get_compiled_rules(self, model_name):
+        """
+        Return the active configurations of a model as a tuple of CompiledRule.
+
+        The result is cached per registry and only invalidated when a
+        configuration, line or usage model changes (see FieldAccessPolicyMixin);
+        the invalidation is propagated to the other workers by the registry.
+        """
+        configs = self.sudo().search([
+            ('active', '=', True),
+            ('model_name', '=', model_name)
+        ])
+        return tuple(config._compile_rule() for config in configs)
+
+    def _compile_rule(self):
+        """Build the immutable CompiledRule of this configuration"""
+        self.ensure_one()
+        readonly_fields = frozenset(
+            line.field_name for line in self.field_line_ids if line.access_type == 'readonly'
+        )
+        hidden_fields = frozenset(
+            line.field_name for line in self.field_line_ids if line.access_type == 'hidden'
+        )
+        usage_specs = ()
+        if self.check_usage:
+            usage_specs = tuple(
+                UsageSpec(
+                    id=usage.id,
+                    usage_model=usage.usage_model_name,
+                    field_name=usage.relation_field_name,
+                    prevent_update=usage.prevent_update_if_used,
+                    prevent_delete=usage.prevent_delete_if_used,
+                    prevent_duplicate=usage.prevent_duplicate_if_used,
+                    # counters being rebuilt are not reliable yet, usage is probed meanwhile
+                    materialized=usage.materialized and not usage.counter_rebuild_requested,
+                    guarded_fields=frozenset(usage.guarded_field_ids.mapped('name')),
+                    delegate_field=usage.delegate_field_id.name or None,
+                )
+                for usage in self.usage_model_ids
+            )
+            auto_flags = dict(
+                prevent_update=self.auto_detect_prevent_update,
+                prevent_delete=self.auto_detect_prevent_delete,
+                prevent_duplicate=self.auto_detect_prevent_duplicate,
+            )
+            if self.auto_detect_usage and any(auto_flags.values()):
+                configured = {(spec.usage_model, spec.field_name) for spec in usage_specs}
+                usage_specs += tuple(
+                    spec._replace(**auto_flags)
+                    for spec in self._get_auto_usage_specs(self.model_name)
+                    if (spec.usage_model, spec.field_name) not in configured
+                )
+        return CompiledRule(
+            config_id=self.id,
+            apply_to=self.apply_to,
+            user_ids=frozenset(self.user_ids.ids),
+            group_ids=frozenset(self.group_ids.ids),
+            prevent_write=self.prevent_write,
+            prevent_delete=self.prevent_delete,
+            readonly_fields=readonly_fields,
+            hidden_fields=hidden_fields,
+            usage_specs=usage_specs,
+        )
+
+    @api.model
+    @tools.ormcache()
+    def _get_protected_models(self):
+        """Return the frozenset of model names having at least one active configuration"""
+        configs = self.sudo().search([('active', '=', True)])
+        return frozenset(configs.mapped('model_name'))
+
+    @api.model
+    @tools.ormcache()
+    def _get_usage_model_specs(self):
+        """Return a frozendict {usage model name: ids of the usage specs reading it}"""
+        usage_models = defaultdict(set)
+        for config in self.sudo().search([('active', '=', True), ('check_usage', '=', True)]):
+            for spec in config._compile_rule().usage_specs:
+                usage_models[spec.usage_model].add(spec.id)
+        return frozendict({model_name: frozenset(ids) for model_name, ids in usage_models.items()})
+
+    @api.model
+    @tools.ormcache('model_name')
+    def _get_auto_usage_specs(self, model_name):
+        """
+        Return the UsageSpec of every stored many2one/many2many field
+        referencing a model, directly or through a model delegating to it
+        (_inherits, e.g. product.product for product.template). They block
+        every operation; configurations select theirs with _replace().
+
+        References with ondelete='cascade' designate records owned by the
+        target (lines, variants) rather than usage, and are ignored, like the
+        create_uid/write_uid log fields and the computed or related fields,
+        derived from other references. The specs get the negative id of their
+        field, not to collide with usage lines.
+        """
+        # referenced model -> field delegating it to model_name (None for model_name itself)
+        targets = {model_name: None}
+        for other_name, other_class in self.env.registry.items():
+            if not other_class._abstract and not other_class._transient \
+                    and model_name in other_class._inherits:
+                targets[other_name] = other_class._inherits[model_name]
+
+        ir_fields = self.env['ir.model.fields'].sudo().search([
+            ('relation', 'in', list(targets)),
+            ('ttype', 'in', ('many2one', 'many2many')),
+            ('store', '=', True),
+            ('name', 'not in', LOG_ACCESS_COLUMNS),
+            ('model_id.transient', '=', False),
+        ], order='model, name')
+
+        usage_specs = []
+        for ir_field in ir_fields:
+            if ir_field.model.startswith('field.access.') or ir_field.model not in self.env:
+                continue
+            field_obj = self.env[ir_field.model]._fields.get(ir_field.name)
+            if not field_obj or not field_obj.store or field_obj.compute:
+                continue
+            if field_obj.type == 'many2one' and field_obj.ondelete == 'cascade':
+                continue
+            usage_specs.append(UsageSpec(
+                id=-ir_field.id,
+                usage_model=ir_field.model,
+                field_name=ir_field.name,
+                prevent_update=True,
+                prevent_delete=True,
+                prevent_duplicate=True,
+                materialized=False,
+                guarded_fields=frozenset(),
+                delegate_field=targets[ir_field.relation],
+            ))
+        return tuple(usage_specs)
+
+    @api.model
+    def _get_group_fingerprint(self, user):
+        """Return the group membership of a user as a hashable cache key"""
+        # _get_group_ids() is cached by res.users and reset when groups change
+        return frozenset(user._get_group_ids())
+
+    @api.model
+    def _is_system_fingerprint(self, group_ids):
+        system_group_id = self.env['ir.model.data']._xmlid_to_res_id(
+            'base.group_system', raise_if_not_found=False)
+        return system_group_id in group_ids
+
+    @api.model
+    @tools.ormcache('model_name', 'user_id', 'group_ids')
+    def _get_effective_policy(self, model_name, user_id, group_ids):
+        """
+        Return the EffectivePolicy merging the rules of a model that affect a
+        user, or None when no rule applies.
+
+        The group fingerprint is part of the cache key, so changing the groups
+        of a user resolves a new policy; configuration changes clear the cache.
+        """
+        field_access_stats.count_cache(self.env, 'effective_policy', misses=1)
+
+        # System admins are never affected
+        if self._is_system_fingerprint(group_ids):
+            return None
+
+        rules = [
+            rule for rule in self._get_compiled_rules(model_name)
+            if rule.affects(user_id, group_ids)
+        ]
+        if not rules:
+            return None
+
+        usage_specs = {}
+        for rule in rules:
+            for spec in rule.usage_specs:
+                merged = usage_specs.setdefault(spec.id, spec)
+                if merged is not spec:
+                    # auto-detected specs are shared by the configurations of
+                    # a model, each blocking its own operations
+                    usage_specs[spec.id] = merged._replace(
+                        prevent_update=merged.prevent_update or spec.prevent_update,
+                        prevent_delete=merged.prevent_delete or spec.prevent_delete,
+                        prevent_duplicate=merged.prevent_duplicate or spec.prevent_duplicate,
+                    )
+
+        return EffectivePolicy(
+            config_ids=frozenset(rule.config_id for rule in rules),
+            prevent_write=any(rule.prevent_write for rule in rules),
+            prevent_delete=any(rule.prevent_delete for rule in rules),
+            readonly_fields=frozenset().union(*(rule.readonly_fields for rule in rules)),
+            hidden_fields=frozenset().union(*(rule.hidden_fields for rule in rules)),
+            usage_specs=tuple(usage_specs.values()),
+        )
+
+    @api.model
+    @tools.ormcache('user_id', 'group_ids')
+    def _get_effective_restrictions(self, user_id, group_ids):
+        """
+        Return the field restrictions of a user on every protected model as
+        a hashable tuple of (model name, readonly fields, hidden fields).
+        """
+        restrictions = []
+        for model_name in sorted(self._get_protected_models()):
+            field_access_stats.count_cache(self.env, 'effective_policy', lookups=1)
+            policy = self._get_effective_policy(model_name, user_id, group_ids)
+            if policy and policy.restricted_fields:
+                restrictions.append((model_name, policy.readonly_fields, policy.hidden_fields))
+        return tuple(restrictions)
+
+    @api.model
+    def _get_user_restrictions(self, user=None):
+        """Return the field restrictions of the given user on every protected model"""
+        user = user or self.env.user
+        return self._get_effective_restrictions(user.id, self._get_group_fingerprint(user))
+
+    @api.model
+    def _get_user_policy(self, model_name, user=None):
+        """Return the EffectivePolicy of a model for the given user, or None"""
+        if model_name not in self._get_protected_models():
+            return None
+
+        user = user or self.env.user
+        field_access_stats.count_cache(self.env, 'effective_policy', lookups=1)
+        return self._get_effective_policy(model_name, user.id, self._get_group_fingerprint(user))
+
+    # -------------------------------
+    # EXPLAIN (Batched Decisions)
+    # -------------------------------
+    @api.model
+    def explain_access(self, user_ids, model_name, record_ids):
+        """
+        Return the decisions of the field access control for users on records
+        of a model, without attempting any operation. Usage is computed once,
+        set-based, for the usage specs of all the users.
+
+        Users other than system administrators can only explain their own access.
+        'write' is only False when every update is blocked; usage guarding
+        specific fields is listed in 'blocking_usage' with its guarded fields.
+        Auto-detected references have the negative id of their field as usage_id.
+
+        :param user_ids: ids of res.users
+        :param model_name: technical name of the target model
+        :param record_ids: ids of records of the target model
+        :return: dict {user id: {
+                    'readonly_fields': [field names],
+                    'hidden_fields': [field names],
+                    'records': {record id: {
+                        'write': bool, 'unlink': bool, 'copy': bool,
+                        'blocking_usage': [{'usage_id', 'usage_model', 'operations',
+                                            'guarded_fields', 'count'}],
+                    }},
+                 }}
+        """
+        if model_name not in self.env:
+            raise UserError(_('Unknown model "%s".') % model_name)
+        if not self.env.user.has_group('base.group_system') and set(user_ids) - {self.env.uid}:
+            raise AccessError(_('You can only explain your own access.'))
+
+        records = self.env[model_name].browse(record_ids).exists()
+        records.check_access('read')
+
+        users = self.env['res.users'].sudo().browse(user_ids).exists()
+        policies = {user.id: self._get_user_policy(model_name, user) for user in users}
+
+        # Usage of all the records for the specs of all the users at once
+        usage_specs = {
+            spec.id: spec
+            for policy in policies.values() if policy
+            for spec in policy.usage_specs
+        }
+        usage = records._get_record_usage(list(usage_specs.values()), records._field_access_count_limit()) \
+            if usage_specs else {}
+
+        result = {}
+        for user_id, policy in policies.items():
+            user_spec_ids = {spec.id for spec in policy.usage_specs} if policy else set()
+            decisions = {}
+            for record_id in records.ids:
+                blocking = [
+                    (spec, count) for spec, count in usage.get(record_id, [])
+                    if spec.id in user_spec_ids
+                ]
+                decisions[record_id] = {
+                    'write': not (policy and policy.prevent_write) and not any(
+                        spec.prevent_update and not spec.guarded_fields for spec, _count in blocking),
+                    'unlink': not (policy and policy.prevent_delete) and not any(
+                        spec.prevent_delete for spec, _count in blocking),
+                    'copy': not any(spec.prevent_duplicate for spec, _count in blocking),
+                    'blocking_usage': [{
+                        'usage_id': spec.id,
+                        'usage_model': spec.usage_model,
+                        'operations': [
+                            operation for operation, flag in (
+                                ('write', spec.prevent_update),
+                                ('unlink', spec.prevent_delete),
+                                ('copy', spec.prevent_duplicate),
+                            ) if flag
+                        ],
+                        'guarded_fields': sorted(spec.guarded_fields),
+                        'count': count,
+                    } for spec, count in blocking],
+                }
+            result[user_id] = {
+                'readonly_fields': sorted(policy.readonly_fields) if policy else [],
+                'hidden_fields': sorted(policy.hidden_fields) if policy else [],
+                'records': decisions,
+            }
+        return result
 
 
 class FieldAccessConfigLine(models.Model):
     _name = 'field.access.config.line'
+    _inherit = ['field.access.policy.mixin']
     _description = 'Field Access Configuration Line'
     _order = 'sequence, id'
 
@@ -98,6 +503,7 @@ class FieldAccessConfigLine(models.Model):
 
 class FieldAccessConfigUsage(models.Model):
     _name = 'field.access.config.usage'
+    _inherit = ['field.access.policy.mixin']
     _description = 'Field Access Configuration Usage Model'
     _order = 'sequence, id'
 
@@ -122,3 +528,291 @@ class FieldAccessConfigUsage(models.Model):
                                             help='Prevent deletion of target record if it exists in this model')
     prevent_duplicate_if_used = fields.Boolean(string='Prevent Duplicate if Used', default=True,
                                             help='Prevent duplicate of target record if it exists in this model')
+
+    relation_model = fields.Char(related='relation_field_id.relation', string='Related Model')
+    delegate_field_id = fields.Many2one('ir.model.fields', string='Delegated Via',
+                                        domain="[('model', '=', relation_model), ('ttype', '=', 'many2one'), "
+                                               "('relation', '=', parent.model_name)]",
+                                        ondelete='set null',
+                                        help='When the relation field points to a model delegating to the target '
+                                             'model, the many2one of that model linking to the target record '
+                                             '(e.g., product_tmpl_id of product.product when product templates are '
+                                             'used through their variants). Defaults to product_tmpl_id for '
+                                             'product templates used through product.product.')
+
+    guarded_field_ids = fields.Many2many('ir.model.fields', 'field_access_config_usage_field_rel',
+                                         'usage_id', 'field_id', string='Guarded Fields',
+                                         domain="[('model_id', '=', parent.model_id)]",
+                                         help='Only check usage on update when one of these fields of the '
+                                              'target record actually changes. Leave empty to guard all fields.')
+
+    materialized = fields.Boolean(string='Materialized Usage',
+                                  help='Keep a usage counter per target record, maintained by a database '
+                                       'trigger on the usage table, so checking usage is a single lookup. '
+                                       'Archived usage records are not counted, like in the regular check.')
+    counter_rebuild_requested = fields.Boolean(string='Counter Rebuild Requested', copy=False,
+                                               help='The counters are waiting for the scheduled action rebuilding '
+                                                    'them; usage is checked without them meanwhile')
+
+    # Index of the relation column, probed on every guarded operation
+    auto_create_index = fields.Boolean(string='Create Missing Index',
+                                       help='Automatically create a btree index on the relation column '
+                                            'when it is missing (built concurrently by a scheduled action)')
+    index_requested = fields.Boolean(string='Index Requested', copy=False,
+                                     help='The missing index is waiting for the scheduled action building it')
+    index_state = fields.Selection([
+        ('indexed', 'Indexed'),
+        ('missing', 'Missing Index'),
+        ('not_applicable', 'Not Applicable'),
+    ], string='Index', compute='_compute_index_state',
+        help='Whether the relation column is covered by a btree index. '
+             'Without one, every guarded operation scans the usage table.')
+    table_row_estimate = fields.Integer(string='Estimated Rows', compute='_compute_index_state')
+    table_size = fields.Char(string='Table Size', compute='_compute_index_state')
+
+    @api.depends('usage_model_name', 'relation_field_name')
+    def _compute_index_state(self):
+        for usage in self:
+            usage.index_state = 'not_applicable'
+            usage.table_row_estimate = 0
+            usage.table_size = False
+            index_target = usage._get_index_target()
+            if not index_target:
+                continue
+
+            table, column = index_target
+            self.env.cr.execute(SQL("""
+                SELECT c.reltuples::bigint, pg_size_pretty(pg_total_relation_size(c.oid)),
+                       EXISTS(SELECT 1
+                                FROM pg_index i
+                                JOIN pg_class ic ON ic.oid = i.indexrelid
+                                JOIN pg_am am ON am.oid = ic.relam
+                                JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = i.indkey[0]
+                               WHERE i.indrelid = c.oid AND i.indisvalid
+                                 AND am.amname = 'btree' AND a.attname = %s)
+                  FROM pg_class c
+                 WHERE c.oid = to_regclass(quote_ident(%s)) AND c.relkind = 'r'
+            """, column, table))
+            row = self.env.cr.fetchone()
+            if not row:
+                continue
+            usage.table_row_estimate = max(row[0], 0)
+            usage.table_size = row[1]
+            usage.index_state = 'indexed' if row[2] else 'missing'
+
+    def _get_index_target(self):
+        """Return the (table, column) holding the relation, or None when not stored in a column"""
+        self.ensure_one()
+        if not self.usage_model_name or self.usage_model_name not in self.env:
+            return None
+        field_obj = self.env[self.usage_model_name]._fields.get(self.relation_field_name)
+        if not field_obj or not field_obj.store:
+            return None
+        if field_obj.type == 'many2one':
+            return self.env[self.usage_model_name]._table, field_obj.name
+        if field_obj.type == 'many2many':
+            return field_obj.relation, field_obj.column2
+        return None
+
+    def _get_self_column(self):
+        """
+        Return the column of the usage table holding the id of the usage
+        record when the relation field references its own model, or None.
+        """
+        self.ensure_one()
+        field_obj = self.env[self.usage_model_name]._fields[self.relation_field_name]
+        if field_obj.comodel_name != self.usage_model_name:
+            return None
+        return 'id' if field_obj.type == 'many2one' else field_obj.column1
+
+    def _get_active_column(self):
+        """Return the active column of the usage table, or None (relation tables have none)"""
+        self.ensure_one()
+        usage_model = self.env[self.usage_model_name]
+        active_name = usage_model._active_name
+        if not active_name or not usage_model._fields[active_name].store \
+                or usage_model._fields[self.relation_field_name].type != 'many2one':
+            return None
+        return active_name
+
+    @api.constrains('delegate_field_id', 'relation_field_id', 'config_id')
+    def _check_delegate_field(self):
+        for usage in self:
+            delegate_field = usage.delegate_field_id
+            if delegate_field and (delegate_field.model != usage.relation_model
+                                   or delegate_field.relation != usage.config_id.model_name):
+                raise ValidationError(_(
+                    'The "Delegated Via" field must be a many2one of "%(model)s" linking to the target model "%(target)s".'
+                ) % {
+                    'model': usage.relation_model,
+                    'target': usage.config_id.model_name,
+                })
+
+    @api.constrains('materialized', 'usage_model_id', 'relation_field_id')
+    def _check_materialized(self):
+        for usage in self:
+            if not usage.materialized:
+                continue
+            if not usage._get_index_target():
+                raise ValidationError(_(
+                    'Materialized usage requires a stored many2one or many2many relation field.'
+                ))
+            # archiving does not touch the relation table, so its trigger cannot follow it
+            if usage.relation_field_id.ttype == 'many2many' and self.env[usage.usage_model_name]._active_name:
+                raise ValidationError(_(
+                    'Materialized usage is not supported for many2many fields of archivable models.'
+                ))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records.filtered('auto_create_index')._schedule_index_creation()
+        records.filtered('materialized')._install_usage_counter()
+        return records
+
+    def write(self, vals):
+        counter_fields = {'materialized', 'usage_model_id', 'relation_field_id'}
+        if counter_fields & set(vals):
+            self.filtered('materialized')._drop_usage_counter()
+        res = super().write(vals)
+        if {'auto_create_index', 'usage_model_id', 'relation_field_id'} & set(vals):
+            self.filtered('auto_create_index')._schedule_index_creation()
+        if counter_fields & set(vals):
+            self.filtered('materialized')._install_usage_counter()
+        return res
+
+    def unlink(self):
+        self.filtered('materialized')._drop_usage_counter()
+        return super().unlink()
+
+    def _install_usage_counter(self):
+        Counter = self.env['field.access.usage.counter'].sudo()
+        for usage in self:
+            Counter._install_trigger(usage)
+        self._schedule_counter_rebuild()
+
+    def _drop_usage_counter(self):
+        Counter = self.env['field.access.usage.counter'].sudo()
+        for usage in self:
+            Counter._drop_trigger(usage)
+
+    def action_rebuild_usage_counter(self):
+        """Request the backfill or repair of the materialized counters (e.g. after direct SQL imports)"""
+        self.check_access('write')
+        self._schedule_counter_rebuild()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'info',
+                'message': _('The counters will be rebuilt in the background.'),
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
+    def _schedule_counter_rebuild(self):
+        """
+        Request the rebuild of the counters from the scheduled action doing
+        it, triggered once the current transaction commits. The rebuild locks
+        the usage table, so it must not run in a user request.
+        """
+        materialized = self.filtered('materialized')
+        if not materialized:
+            return
+        materialized.counter_rebuild_requested = True
+        self.env.ref('field_access_control.ir_cron_rebuild_usage_counters').sudo()._trigger()
+
+    @api.model
+    def _cron_rebuild_usage_counters(self):
+        """Rebuild the requested counters"""
+        usages = self.search([('counter_rebuild_requested', '=', True)])
+        usages._rebuild_usage_counter()
+        usages.counter_rebuild_requested = False
+
+    def _rebuild_usage_counter(self):
+        """Recompute the materialized counters from the usage tables"""
+        self.env['field.access.usage.counter'].flush_model()
+        for usage in self.filtered('materialized'):
+            self.env[usage.usage_model_name].flush_model()
+            self.env['field.access.usage.counter'].sudo()._rebuild(usage)
+        self.env['field.access.usage.counter'].invalidate_model()
+
+    @api.model
+    def _rebuild_usage_counters(self):
+        """Rebuild the counters of all the materialized usage models"""
+        self.search([('materialized', '=', True)])._rebuild_usage_counter()
+
+    def action_create_index(self):
+        """Request the creation of the missing index of the relation column"""
+        self._schedule_index_creation()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'info',
+                'message': _('The missing indexes will be created in the background.'),
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
+    def _schedule_index_creation(self):
+        """
+        Request the missing indexes from the scheduled action building them,
+        triggered once the current transaction commits. Building an index on
+        a large table takes long, so it must not run in a user request.
+        """
+        missing = self.filtered(lambda usage: usage.index_state == 'missing')
+        if not missing:
+            return
+        missing.index_requested = True
+        self.env.ref('field_access_control.ir_cron_create_usage_indexes').sudo()._trigger()
+
+    @api.model
+    def _cron_create_missing_indexes(self):
+        """Build the requested indexes and the missing ones of the "Create Missing Index" lines"""
+        usages = self.search(['|', ('index_requested', '=', True), ('auto_create_index', '=', True)])
+        targets = {
+            usage._get_index_target()
+            for usage in usages
+            if usage.index_state == 'missing'
+        }
+        usages.filtered('index_requested').index_requested = False
+        # CREATE INDEX CONCURRENTLY waits for all the older transactions,
+        # including this one, so it must be committed first
+        self.env.cr.commit()
+        if targets:
+            self._create_indexes(targets)
+
+    @api.model
+    def _create_indexes(self, targets):
+        """
+        Create the btree indexes of the given (table, column), concurrently.
+
+        CREATE INDEX CONCURRENTLY cannot run in a transaction, so it runs in
+        its own autocommit cursor. An interrupted build leaves an INVALID
+        index behind, which is dropped before retrying. Errors are logged,
+        and do not prevent building the other indexes.
+        """
+        with self.env.registry.cursor() as cr:
+            cr._cnx.autocommit = True
+            try:
+                for table, column in targets:
+                    index_name = ('%s_%s_fac_index' % (table, column))[:63]
+                    try:
+                        cr.execute(SQL("""
+                            SELECT 1
+                              FROM pg_index i
+                             WHERE i.indexrelid = to_regclass(quote_ident(%s)) AND NOT i.indisvalid
+                        """, index_name))
+                        if cr.fetchone():
+                            _logger.info("Dropping invalid index %s", index_name)
+                            cr.execute(SQL("DROP INDEX CONCURRENTLY IF EXISTS %s", SQL.identifier(index_name)))
+                        _logger.info("Creating index %s on %s(%s)", index_name, table, column)
+                        cr.execute(SQL(
+                            "CREATE INDEX CONCURRENTLY IF NOT EXISTS %s ON %s (%s)",
+                            SQL.identifier(index_name), SQL.identifier(table), SQL.identifier(column),
+                        ))
+                    except Exception:
+                        _logger.exception("Failed to create index %s on %s(%s)", index_name, table, column)
+            finally:
+                cr._cnx.autocommit = False
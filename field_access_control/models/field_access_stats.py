@@ -0,0 +1,152 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from odoo import models, fields, api, _
+
+_logger = logging.getLogger(__name__)
+
+# Statistics of the current worker process:
+# {(model name, operation): [calls, seconds, queries]} and {cache name: [lookups, misses]}
+_operation_stats = defaultdict(lambda: [0, 0.0, 0])
+_cache_stats = defaultdict(lambda: [0, 0])
+_stats_lock = threading.Lock()
+_last_log = [time.monotonic()]
+
+
+def is_enabled(env):
+    """Check the "field_access_control.stats_enabled" system parameter (cached)"""
+    return bool(env['ir.config_parameter'].sudo().get_param('field_access_control.stats_enabled'))
+
+
+@contextmanager
+def measure(env, model_name, operation):
+    """Count the calls, time and SQL queries of an enforcement entry point"""
+    if not is_enabled(env):
+        yield
+        return
+
+    start = time.perf_counter()
+    start_queries = env.cr.sql_log_count
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _stats_lock:
+            stats = _operation_stats[model_name, operation]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] += env.cr.sql_log_count - start_queries
+        _log_stats(env)
+
+
+def count_cache(env, cache_name, lookups=0, misses=0):
+    """Count the lookups and misses of a cache"""
+    if not is_enabled(env):
+        return
+    with _stats_lock:
+        stats = _cache_stats[cache_name]
+        stats[0] += lookups
+        stats[1] += misses
+
+
+def snapshot():
+    """Return copies of the operation and cache statistics of this worker"""
+    with _stats_lock:
+        return (
+            {key: tuple(value) for key, value in _operation_stats.items()},
+            {key: tuple(value) for key, value in _cache_stats.items()},
+        )
+
+
+def reset():
+    with _stats_lock:
+        _operation_stats.clear()
+        _cache_stats.clear()
+
+
+def _log_stats(env):
+    """Log the statistics as one JSON line, at most every "stats_log_interval" seconds"""
+    interval = int(env['ir.config_parameter'].sudo().get_param(
+        'field_access_control.stats_log_interval', 60) or 0)
+    now = time.monotonic()
+    if not interval or now - _last_log[0] < interval:
+        return
+    _last_log[0] = now
+
+    operations, caches = snapshot()
+    _logger.info("field_access_stats %s", json.dumps({
+        'db': env.cr.dbname,
+        'operations': [
+            {'model': model_name, 'operation': operation,
+             'calls': calls, 'seconds': round(seconds, 6), 'queries': queries}
+            for (model_name, operation), (calls, seconds, queries) in sorted(operations.items())
+        ],
+        'caches': [
+            {'cache': cache_name, 'lookups': lookups, 'misses': misses}
+            for cache_name, (lookups, misses) in sorted(caches.items())
+        ],
+    }))
+
+
+class FieldAccessStats(models.TransientModel):
+    _name = 'field.access.stats'
+    _description = 'Field Access Enforcement Statistics'
+    _order = 'total_time desc, id'
+
+    kind = fields.Selection([
+        ('operation', 'Operation'),
+        ('cache', 'Cache'),
+    ], string='Kind', required=True, default='operation')
+    model_name = fields.Char(string='Model')
+    operation = fields.Char(string='Operation / Cache')
+    calls = fields.Integer(string='Calls')
+    total_time = fields.Float(string='Total Time (ms)', digits=(16, 2))
+    avg_time = fields.Float(string='Average Time (ms)', digits=(16, 3))
+    queries = fields.Integer(string='Queries')
+    avg_queries = fields.Float(string='Average Queries', digits=(16, 2))
+    hits = fields.Integer(string='Cache Hits')
+    misses = fields.Integer(string='Cache Misses')
+    hit_ratio = fields.Float(string='Hit Ratio (%)', digits=(16, 1))
+
+    @api.model
+    def action_open_stats(self):
+        """Load the statistics of the worker serving the request and display them"""
+        self.search([]).unlink()
+        operations, caches = snapshot()
+        vals_list = [{
+            'kind': 'operation',
+            'model_name': model_name,
+            'operation': operation,
+            'calls': calls,
+            'total_time': seconds * 1000,
+            'avg_time': seconds * 1000 / calls if calls else 0,
+            'queries': queries,
+            'avg_queries': queries / calls if calls else 0,
+        } for (model_name, operation), (calls, seconds, queries) in operations.items()]
+        vals_list += [{
+            'kind': 'cache',
+            'operation': cache_name,
+            'hits': max(lookups - misses, 0),
+            'misses': misses,
+            'hit_ratio': 100 * max(lookups - misses, 0) / lookups if lookups else 0,
+        } for cache_name, (lookups, misses) in caches.items()]
+        self.create(vals_list)
+
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Enforcement Statistics'),
+            'res_model': self._name,
+            'view_mode': 'list',
+            'context': {'search_default_group_kind': 1},
+            'help': _('<p>No statistics yet. Enable the "field_access_control.stats_enabled" '
+                      'system parameter to collect them.</p>') if not is_enabled(self.env) else False,
+        }
+
+    @api.model
+    def action_reset_stats(self):
+        reset()
+        return self.action_open_stats()
@@ -0,0 +1,135 @@
+from odoo import models, fields, api, _
+from odoo.tools import SQL
+
+
+class FieldAccessUsageCounter(models.Model):
+    _name = 'field.access.usage.counter'
+    _description = 'Field Access Materialized Usage Counter'
+    _log_access = False
+
+    usage_id = fields.Many2one('field.access.config.usage', string='Usage Model',
+                               required=True, ondelete='cascade')
+    res_id = fields.Integer(string='Target Record ID', required=True)
+    usage_count = fields.Integer(string='Usage Count', default=0)
+
+    _sql_constraints = [
+        ('usage_res_uniq', 'unique(usage_id, res_id)',
+         'A target record can only have one counter per usage model.'),
+    ]
+
+    @api.model
+    def _get_used_counts(self, usage_id, target_ids):
+        """Return {target id: count} of the used target ids, read from the counters"""
+        self.env.cr.execute(SQL(
+            "SELECT res_id, usage_count FROM %s WHERE usage_id = %s AND res_id = ANY(%s) AND usage_count > 0",
+            SQL.identifier(self._table), usage_id, list(target_ids),
+        ))
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _rebuild(self, usage):
+        """
+        Recompute all the counters of a usage model line from its usage table.
+
+        The usage table is locked against writes meanwhile: the triggers of
+        rows written concurrently would otherwise update the counters being
+        rebuilt, and be lost or violate their unique constraint.
+        """
+        table, column = usage._get_index_target()
+        self.env.cr.execute(SQL("LOCK TABLE %s IN SHARE MODE", SQL.identifier(table)))
+        self.env.cr.execute(SQL(
+            "DELETE FROM %s WHERE usage_id = %s",
+            SQL.identifier(self._table), usage.id,
+        ))
+        counted = SQL("%s IS NOT NULL", SQL.identifier(column))
+        self_column = usage._get_self_column()
+        if self_column:
+            counted = SQL("%s AND %s <> %s", counted, SQL.identifier(column), SQL.identifier(self_column))
+        active_column = usage._get_active_column()
+        if active_column:
+            counted = SQL("%s AND %s IS TRUE", counted, SQL.identifier(active_column))
+        self.env.cr.execute(SQL("""
+            INSERT INTO %s (usage_id, res_id, usage_count)
+            SELECT %s, %s, count(*) FROM %s WHERE %s GROUP BY %s
+        """, SQL.identifier(self._table), usage.id, SQL.identifier(column), SQL.identifier(table),
+            counted, SQL.identifier(column)))
+
+    @api.model
+    def _install_trigger(self, usage):
+        """
+        Maintain the counters of a usage model line incrementally with a
+        trigger on its usage table, so that rows created, re-linked, archived
+        or deleted through the ORM or direct SQL are all accounted for.
+        Archived rows and rows referencing themselves are not counted, like
+        in the EXISTS probe.
+        """
+        table, column = usage._get_index_target()
+        name = SQL.identifier(self._trigger_name(usage))
+        column = SQL.identifier(column)
+        counter_table = SQL.identifier(self._table)
+        old_counted = SQL("OLD.%s IS NOT NULL", column)
+        new_counted = SQL("NEW.%s IS NOT NULL", column)
+        unchanged = SQL("OLD.%s IS NOT DISTINCT FROM NEW.%s", column, column)
+        update_columns = column
+        self_column = usage._get_self_column()
+        if self_column:
+            self_column = SQL.identifier(self_column)
+            old_counted = SQL("%s AND OLD.%s <> OLD.%s", old_counted, column, self_column)
+            new_counted = SQL("%s AND NEW.%s <> NEW.%s", new_counted, column, self_column)
+        active_column = usage._get_active_column()
+        if active_column:
+            active_column = SQL.identifier(active_column)
+            old_counted = SQL("%s AND OLD.%s IS TRUE", old_counted, active_column)
+            new_counted = SQL("%s AND NEW.%s IS TRUE", new_counted, active_column)
+            unchanged = SQL("%s AND OLD.%s IS NOT DISTINCT FROM NEW.%s", unchanged, active_column, active_column)
+            update_columns = SQL("%s, %s", column, active_column)
+        self.env.cr.execute(SQL("""
+            CREATE OR REPLACE FUNCTION %(name)s() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE' THEN
+                    IF %(unchanged)s THEN
+                        RETURN NULL;
+                    END IF;
+                END IF;
+                IF TG_OP <> 'INSERT' THEN
+                    IF %(old_counted)s THEN
+                        UPDATE %(counter_table)s SET usage_count = usage_count - 1
+                         WHERE usage_id = %(usage_id)s AND res_id = OLD.%(column)s;
+                    END IF;
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    IF %(new_counted)s THEN
+                        INSERT INTO %(counter_table)s (usage_id, res_id, usage_count)
+                        VALUES (%(usage_id)s, NEW.%(column)s, 1)
+                        ON CONFLICT (usage_id, res_id)
+                        DO UPDATE SET usage_count = %(counter_table)s.usage_count + 1;
+                    END IF;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS %(name)s ON %(table)s;
+            CREATE TRIGGER %(name)s AFTER INSERT OR DELETE OR UPDATE OF %(update_columns)s ON %(table)s
+                FOR EACH ROW EXECUTE FUNCTION %(name)s();
+        """, name=name, column=column, counter_table=counter_table, usage_id=usage.id,
+            table=SQL.identifier(table), unchanged=unchanged, old_counted=old_counted,
+            new_counted=new_counted, update_columns=update_columns))
+
+    @api.model
+    def _drop_trigger(self, usage):
+        """Remove the trigger and counters of a usage model line"""
+        name = SQL.identifier(self._trigger_name(usage))
+        index_target = usage._get_index_target()
+        if index_target:
+            self.env.cr.execute(SQL(
+                "DROP TRIGGER IF EXISTS %s ON %s", name, SQL.identifier(index_target[0]),
+            ))
+        self.env.cr.execute(SQL("DROP FUNCTION IF EXISTS %s()", name))
+        self.env.cr.execute(SQL(
+            "DELETE FROM %s WHERE usage_id = %s", SQL.identifier(self._table), usage.id,
+        ))
+
+    @api.model
+    def _trigger_name(self, usage):
+        return 'field_access_usage_counter_%s' % usage.id
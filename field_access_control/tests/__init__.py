@@ -0,0 +1,5 @@
+from . import test_field_access_auto_detect
+from . import test_field_access_counter
+from . import test_field_access_create
+from . import test_field_access_performance
+from . import test_field_access_usage
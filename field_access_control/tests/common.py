@@ -0,0 +1,51 @@
+from odoo import Command
+from odoo.tests import TransactionCase, new_test_user
+
+from ..models.base_model_override import DEFERRED_KEY, USAGE_MEMO_KEY
+
+
+class FieldAccessCase(TransactionCase):
+    """Restricted test user, and helpers creating configurations applying to it"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = new_test_user(
+            cls.env, login='field_access_user',
+            groups='base.group_user,base.group_partner_manager,sales_team.group_sale_manager',
+        )
+
+    def setUp(self):
+        super().setUp()
+        # transaction data is not reset by the savepoint isolating each test
+        self.env.cr.postcommit.data.pop(USAGE_MEMO_KEY, None)
+        self.env.cr.postcommit.data.pop(DEFERRED_KEY, None)
+
+    @classmethod
+    def _field(cls, model_name, field_name):
+        return cls.env['ir.model.fields']._get(model_name, field_name)
+
+    @classmethod
+    def _usage_line(cls, model_name, field_name, **vals):
+        return Command.create({
+            'usage_model_id': cls.env['ir.model']._get_id(model_name),
+            'relation_field_id': cls._field(model_name, field_name).id,
+            **vals,
+        })
+
+    @classmethod
+    def _create_config(cls, model_name, readonly_fields=(), usage_lines=(), **vals):
+        """Create a configuration of ``model_name`` applying to the test user"""
+        return cls.env['field.access.config'].create({
+            'name': 'Field Access Test: %s' % model_name,
+            'model_id': cls.env['ir.model']._get_id(model_name),
+            'apply_to': 'users',
+            'user_ids': [Command.set(cls.user.ids)],
+            'field_line_ids': [
+                Command.create({'field_id': cls._field(model_name, field_name).id})
+                for field_name in readonly_fields
+            ],
+            'check_usage': bool(usage_lines),
+            'usage_model_ids': list(usage_lines),
+            **vals,
+        })
@@ -0,0 +1,63 @@
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import FieldAccessCase
+
+
+@tagged('post_install', '-at_install')
+class TestFieldAccessAutoDetect(FieldAccessCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.config = cls._create_config('res.partner.industry', check_usage=True, auto_detect_usage=True)
+        cls.industry, cls.free_industry = cls.env['res.partner.industry'].create([
+            {'name': 'Field Access Industry'},
+            {'name': 'Field Access Free Industry'},
+        ])
+        cls.env['res.partner'].create({'name': 'Field Access Partner', 'industry_id': cls.industry.id})
+
+    def _auto_usage_specs(self, model_name):
+        return {
+            (spec.usage_model, spec.field_name): spec
+            for spec in self.env['field.access.config']._get_auto_usage_specs(model_name)
+        }
+
+    def test_auto_usage_specs(self):
+        specs = self._auto_usage_specs('res.partner')
+        self.assertIn(('res.partner', 'parent_id'), specs)
+        self.assertIsNone(specs[('sale.order', 'partner_id')].delegate_field)
+        # references to users are references to their partner
+        self.assertEqual(specs[('res.groups', 'users')].delegate_field, 'partner_id')
+        # log fields, and computed references derived from other ones, are not usage
+        self.assertNotIn(('sale.order', 'create_uid'), specs)
+        self.assertNotIn(('res.partner', 'commercial_partner_id'), specs)
+
+        # records owned by the target are deleted with it
+        self.assertNotIn(('sale.order.line', 'order_id'), self._auto_usage_specs('sale.order'))
+
+    def test_auto_usage_operations(self):
+        Industry = self.env['res.partner.industry'].with_user(self.user)
+        # only deletion is blocked by default
+        Industry.browse(self.industry.id).write({'full_name': 'Field Access'})
+        with self.assertRaises(UserError):
+            Industry.browse(self.industry.id).unlink()
+
+        result = self.env['field.access.config'].explain_access(
+            [self.user.id], 'res.partner.industry', (self.industry | self.free_industry).ids)
+        decisions = result[self.user.id]['records']
+        self.assertEqual(
+            {key: decisions[self.industry.id][key] for key in ('write', 'unlink', 'copy')},
+            {'write': True, 'unlink': False, 'copy': True},
+        )
+        self.assertEqual(decisions[self.industry.id]['blocking_usage'][0]['usage_model'], 'res.partner')
+        self.assertFalse(decisions[self.free_industry.id]['blocking_usage'])
+
+        self.config.write({'auto_detect_prevent_update': True, 'auto_detect_prevent_delete': False})
+        with self.assertRaises(UserError):
+            Industry.browse(self.industry.id).write({'full_name': 'Field Access Again'})
+        Industry.browse(self.free_industry.id).write({'full_name': 'Field Access'})
+
+        # nothing selected, nothing blocked
+        self.config.auto_detect_prevent_update = False
+        Industry.browse(self.industry.id).write({'full_name': 'Field Access Again'})
@@ -0,0 +1,65 @@
+from odoo.exceptions import AccessError, UserError
+from odoo.tests import tagged
+
+from .common import FieldAccessCase
+
+
+@tagged('post_install', '-at_install')
+class TestFieldAccessCounter(FieldAccessCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.config = cls._create_config('res.partner.industry', usage_lines=[
+            cls._usage_line('res.partner', 'industry_id', materialized=True),
+        ])
+        cls.usage = cls.config.usage_model_ids
+        cls.env['field.access.config.usage']._cron_rebuild_usage_counters()
+        cls.industry, cls.other_industry = cls.env['res.partner.industry'].create([
+            {'name': 'Field Access Industry'},
+            {'name': 'Field Access Other Industry'},
+        ])
+
+    def _used_counts(self):
+        self.env.flush_all()
+        return self.env['field.access.usage.counter']._get_used_counts(
+            self.usage.id, (self.industry | self.other_industry).ids)
+
+    def test_counter_trigger(self):
+        partner = self.env['res.partner'].create({'name': 'Field Access Partner', 'industry_id': self.industry.id})
+        self.assertEqual(self._used_counts(), {self.industry.id: 1})
+
+        partner.industry_id = self.other_industry
+        self.assertEqual(self._used_counts(), {self.other_industry.id: 1})
+
+        # archived rows are not counted
+        partner.active = False
+        self.assertEqual(self._used_counts(), {})
+        partner.active = True
+        self.assertEqual(self._used_counts(), {self.other_industry.id: 1})
+
+        partner.unlink()
+        self.assertEqual(self._used_counts(), {})
+
+    def test_counter_usage_check(self):
+        self.env['res.partner'].create({'name': 'Field Access Partner', 'industry_id': self.industry.id})
+        with self.assertRaises(UserError):
+            self.industry.with_user(self.user).write({'full_name': 'Field Access'})
+        self.other_industry.with_user(self.user).write({'full_name': 'Field Access'})
+
+    def test_counter_rebuild(self):
+        self.env['res.partner'].create({'name': 'Field Access Partner', 'industry_id': self.industry.id})
+        self.env.flush_all()
+        self.env.cr.execute("DELETE FROM field_access_usage_counter WHERE usage_id = %s", [self.usage.id])
+        self.assertEqual(self._used_counts(), {})
+
+        # the rebuild is requested, and only run by the scheduled action
+        with self.assertRaises(AccessError):
+            self.usage.with_user(self.user).action_rebuild_usage_counter()
+        self.usage.action_rebuild_usage_counter()
+        self.assertTrue(self.usage.counter_rebuild_requested)
+        self.assertEqual(self._used_counts(), {})
+
+        self.env['field.access.config.usage']._cron_rebuild_usage_counters()
+        self.assertFalse(self.usage.counter_rebuild_requested)
+        self.assertEqual(self._used_counts(), {self.industry.id: 1})
@@ -0,0 +1,87 @@
+from odoo import Command
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import FieldAccessCase
+
+
+@tagged('post_install', '-at_install')
+class TestFieldAccessCreate(FieldAccessCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._create_config('product.template', readonly_fields=['list_price'])
+        cls._create_config('sale.order', readonly_fields=['name'])
+        cls._create_config('sale.order.line', readonly_fields=['price_unit', 'sequence'])
+        cls.partner = cls.env['res.partner'].create({'name': 'Field Access Customer'})
+        cls.product = cls.env['product.product'].create({'name': 'Field Access Product', 'list_price': 10})
+
+    def test_create_restricted_fields(self):
+        Template = self.env['product.template'].with_user(self.user)
+        with self.assertRaises(UserError):
+            Template.web_save({'name': 'Field Access Priced', 'list_price': 5}, {})
+        # empty values are rejected as well
+        with self.assertRaises(UserError):
+            Template.web_save({'name': 'Field Access Free', 'list_price': 0}, {})
+
+        # context defaults do not apply to restricted fields
+        result = Template.with_context(default_list_price=999).web_save({'name': 'Field Access Default'}, {})
+        self.assertEqual(Template.browse(result[0]['id']).list_price, 1.0)
+
+    def test_create_override_values(self):
+        """Values added by create() overrides are not checked"""
+        result = self.env['sale.order'].with_user(self.user).web_save(
+            {'partner_id': self.partner.id}, {'name': {}})
+        self.assertNotEqual(result[0]['name'], 'New')
+
+    def test_create_x2many_commands(self):
+        Order = self.env['sale.order'].with_user(self.user)
+        with self.assertRaises(UserError):
+            Order.web_save({
+                'partner_id': self.partner.id,
+                'order_line': [Command.create({'product_id': self.product.id, 'price_unit': 1})],
+            }, {})
+
+        result = Order.web_save({
+            'partner_id': self.partner.id,
+            'order_line': [Command.create({'product_id': self.product.id})],
+        }, {})
+        order = Order.browse(result[0]['id'])
+        self.assertEqual(order.order_line.price_unit, 10)
+
+        # lines added to an existing record are checked as well
+        with self.assertRaises(UserError):
+            order.web_save({
+                'order_line': [Command.create({'product_id': self.product.id, 'price_unit': 1})],
+            }, {})
+
+    def test_import_restricted_fields(self):
+        Template = self.env['product.template'].with_user(self.user)
+        with self.assertRaises(UserError):
+            Template.load(['name', 'list_price'], [['Field Access Import', '5']])
+        result = Template.load(['name'], [['Field Access Import']])
+        self.assertTrue(result['ids'])
+
+        # columns of the imported lines
+        with self.assertRaises(UserError):
+            self.env['sale.order'].with_user(self.user).load(
+                ['partner_id/.id', 'order_line/product_id/.id', 'order_line/price_unit'],
+                [[str(self.partner.id), str(self.product.id), '1']],
+            )
+
+    def test_copy_restricted_fields(self):
+        # restricted fields are copied as is, but cannot be overridden
+        template = self.product.product_tmpl_id.with_user(self.user)
+        self.assertEqual(template.copy().list_price, 10)
+        with self.assertRaises(UserError):
+            template.copy({'list_price': 1})
+
+        # the copied lines (with their restricted sequence) of an unprotected record are not checked either
+        order = self.env['sale.order'].create({
+            'partner_id': self.partner.id,
+            'order_line': [Command.create({'product_id': self.product.id, 'sequence': 7})],
+        }).with_user(self.user)
+        self.assertEqual(order.copy().order_line.sequence, 7)
+        with self.assertRaises(UserError):
+            order.copy({'order_line': [Command.create({'product_id': self.product.id, 'price_unit': 1})]})
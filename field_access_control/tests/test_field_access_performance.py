@@ -0,0 +1,235 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from odoo import Command
+from odoo.exceptions import UserError
+from odoo.sql_db import Cursor
+from odoo.tests import TransactionCase, new_test_user, tagged
+
+from ..models.base_model_override import USAGE_MEMO_KEY
+
+_logger = logging.getLogger(__name__)
+
+# Multiplier of the timing bounds, to run the suite on slower machines
+TIME_FACTOR = float(os.environ.get('FIELD_ACCESS_PERF_TIME_FACTOR', 1))
+# Path of the JSON report, e.g. FIELD_ACCESS_PERF_REPORT=/tmp/field_access_perf.json
+REPORT_PATH = os.environ.get('FIELD_ACCESS_PERF_REPORT')
+
+
+@tagged('post_install', '-at_install', '-standard', 'field_access_perf')
+class TestFieldAccessPerformance(TransactionCase):
+    """
+    Query count and timing of the enforcement paths. Not part of the standard
+    test run, use ``--test-tags field_access_perf``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = []
+
+        cls.restricted_group = cls.env['res.groups'].create({'name': 'Field Access Restricted'})
+        cls.user = new_test_user(
+            cls.env, login='field_access_perf',
+            groups='base.group_user,base.group_partner_manager,sales_team.group_sale_manager,'
+                   'purchase.group_purchase_manager',
+        )
+        cls.user.groups_id += cls.restricted_group
+
+        cls.config = cls.env['field.access.config'].create({
+            'name': 'Performance: Product Templates',
+            'model_id': cls.env['ir.model']._get_id('product.template'),
+            'apply_to': 'groups',
+            'group_ids': [Command.set(cls.restricted_group.ids)],
+            'check_usage': True,
+            'field_line_ids': [Command.create({'field_id': cls._field('product.template', 'list_price').id})],
+            'usage_model_ids': [
+                Command.create({
+                    'usage_model_id': cls.env['ir.model']._get_id(model_name),
+                    'relation_field_id': cls._field(model_name, 'product_id').id,
+                })
+                for model_name in ('sale.order.line', 'purchase.order.line', 'account.move.line')
+            ],
+        })
+        cls.usage_specs = cls.config._compile_rule().usage_specs
+
+        cls.partner = cls.env['res.partner'].create({'name': 'Field Access Customer'})
+        cls.templates = cls.env['product.template'].create([
+            {'name': 'Field Access Product %s' % index} for index in range(10001)
+        ])
+        cls.used_template = cls.templates[0]
+        cls.env['sale.order'].create({
+            'partner_id': cls.partner.id,
+            'order_line': [Command.create({'product_id': cls.used_template.product_variant_id.id})],
+        })
+        cls.env.flush_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        report = json.dumps({'suite': 'field_access_perf', 'results': cls.results}, indent=2)
+        _logger.info("field_access_perf report:\n%s", report)
+        if REPORT_PATH:
+            with open(REPORT_PATH, 'w') as report_file:
+                report_file.write(report)
+        super().tearDownClass()
+
+    @classmethod
+    def _field(cls, model_name, field_name):
+        return cls.env['ir.model.fields']._get(model_name, field_name)
+
+    def setUp(self):
+        super().setUp()
+        self.env.cr.postcommit.data.pop(USAGE_MEMO_KEY, None)
+
+    @contextmanager
+    def _measure(self, name, records=1, max_queries=None, max_seconds=None):
+        """Record the query count and time of the block, and check their bounds"""
+        self.env.flush_all()
+        queries = []
+        execute = Cursor.execute
+
+        def tracked_execute(cr, query, params=None, log_exceptions=True):
+            queries.append(str(getattr(query, 'code', query)))
+            return execute(cr, query, params, log_exceptions)
+
+        with patch.object(Cursor, 'execute', tracked_execute):
+            start = time.perf_counter()
+            yield queries
+            self.env.flush_all()
+            elapsed = time.perf_counter() - start
+
+        self.results.append({
+            'name': name,
+            'records': records,
+            'queries': len(queries),
+            'field_access_queries': len([query for query in queries if 'field_access' in query]),
+            'seconds': round(elapsed, 6),
+        })
+        if max_queries is not None:
+            self.assertLessEqual(len(queries), max_queries, "%s: too many queries" % name)
+        if max_seconds is not None:
+            self.assertLessEqual(elapsed, max_seconds * TIME_FACTOR, "%s: too slow" % name)
+
+    def _set_restricted_fields(self, count):
+        """Restrict the first ``count`` stored fields of product templates"""
+        fields = self.env['ir.model.fields'].search([
+            ('model', '=', 'product.template'),
+            ('store', '=', True),
+            ('name', 'not in', ('id', 'name', 'display_name')),
+        ], order='name', limit=count)
+        self.config.field_line_ids = [Command.clear()] + [
+            Command.create({'field_id': field.id}) for field in fields
+        ]
+
+    # -------------------------------
+    # WRITE / UNLINK / COPY / CREATE
+    # -------------------------------
+    def test_unprotected_model_operations(self):
+        """Models without configuration do not pay any query for the module"""
+        Partner = self.env['res.partner'].with_user(self.user)
+        self.env['field.access.config']._get_protected_models()
+        self.env['field.access.config']._get_usage_model_specs()
+
+        with self._measure('unprotected.create') as queries:
+            partner = Partner.create({'name': 'Field Access Partner'})
+        self.assertFalse([query for query in queries if 'field_access' in query])
+
+        with self._measure('unprotected.write') as queries:
+            partner.write({'name': 'Field Access Partner (renamed)'})
+        self.assertFalse([query for query in queries if 'field_access' in query])
+
+        with self._measure('unprotected.copy') as queries:
+            copy = partner.copy()
+        self.assertFalse([query for query in queries if 'field_access' in query])
+
+        with self._measure('unprotected.unlink') as queries:
+            (partner | copy).unlink()
+        self.assertFalse([query for query in queries if 'field_access' in query])
+
+    def test_protected_model_write(self):
+        # warm up the caches, then compare with an unrestricted write
+        self.templates[2].write({'description_sale': 'warm up'})
+        with self._measure('protected.write.admin') as admin_queries:
+            self.templates[3].write({'description_sale': 'admin'})
+
+        template = self.templates[1].with_user(self.user)
+        template.write({'description_sale': 'warm up'})
+        self.env.cr.postcommit.data.pop(USAGE_MEMO_KEY, None)
+        # one variant expansion and one usage probe, plus the access
+        # rights and record rules checks of the restricted user
+        max_queries = len(admin_queries) + 2 + 5
+        with self.assertQueryCount(max_queries), self._measure('protected.write.user', max_seconds=0.5):
+            template.write({'description_sale': 'restricted user'})
+
+        # no-op saves do not probe usage
+        with self._measure('protected.write.noop') as queries:
+            template.write({'description_sale': 'restricted user'})
+        self.assertFalse([query for query in queries if 'EXISTS' in query])
+
+        with self.assertRaises(UserError):
+            template.write({'list_price': 42})
+
+    def test_protected_model_unlink_copy(self):
+        template = self.used_template.with_user(self.user)
+        with self._measure('protected.copy.used'), self.assertRaises(UserError):
+            template.copy()
+        with self._measure('protected.unlink.used'), self.assertRaises(UserError):
+            template.unlink()
+
+        free_templates = self.templates[1:101].with_user(self.user)
+        with self._measure('protected.unlink.100', records=100, max_seconds=5):
+            free_templates.unlink()
+
+    def test_protected_model_create(self):
+        Template = self.env['product.template'].with_user(self.user)
+        vals_list = [{'name': 'Field Access Import %s' % index} for index in range(1000)]
+        with self._measure('protected.create.1k', records=1000) as queries:
+            Template.create(vals_list)
+        self.assertFalse([query for query in queries if 'field_access' in query])
+
+        # the values sent by the client are checked in one pass over the batch
+        vals_list[10]['list_price'] = 10
+        vals_list[500]['list_price'] = 20
+        with self._measure('protected.create.check.1k', records=1000), self.assertRaises(UserError) as error:
+            Template._check_field_access_create(vals_list)
+        self.assertIn('11, 501', str(error.exception))
+
+    # -------------------------------
+    # VIEWS
+    # -------------------------------
+    def test_get_views(self):
+        Template = self.env['product.template'].with_user(self.user)
+        for count in (0, 10, 100):
+            self._set_restricted_fields(count)
+            Template.get_views([(False, 'form'), (False, 'list')])
+            with self._measure('views.get_views.%s_fields' % count, records=count,
+                               max_seconds=0.5) as queries:
+                Template.get_views([(False, 'form'), (False, 'list')])
+            self.assertFalse([query for query in queries if 'field_access' in query])
+
+    # -------------------------------
+    # USAGE CHECKS
+    # -------------------------------
+    def test_usage_checks(self):
+        for count in (1, 1000, 10000):
+            templates = self.templates[1:count + 1]
+            self.env.cr.postcommit.data.pop(USAGE_MEMO_KEY, None)
+            # one variant expansion and one UNION ALL probing all the usage models
+            with self.assertQueryCount(2), \
+                    self._measure('usage.check.%s' % count, records=count, max_seconds=0.2 + count / 5000):
+                templates._check_record_usage(self.usage_specs, 'update')
+
+            # unused templates are memoized for the rest of the transaction,
+            # only the variant expansion is queried again
+            with self.assertQueryCount(1):
+                templates._check_record_usage(self.usage_specs, 'update')
+
+        # usage models written in the transaction are probed again
+        self.env['sale.order.line'].search([], limit=1).write({'name': 'Field Access Line'})
+        self.env.flush_all()
+        with self.assertQueryCount(2):
+            templates._check_record_usage(self.usage_specs, 'update')
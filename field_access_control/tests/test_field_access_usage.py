@@ -0,0 +1,114 @@
+from contextlib import suppress
+
+from odoo import Command
+from odoo.exceptions import AccessError, UserError, ValidationError
+from odoo.tests import tagged
+
+from ..models.base_model_override import DEFERRED_KEY
+from .common import FieldAccessCase
+
+
+@tagged('post_install', '-at_install')
+class TestFieldAccessUsage(FieldAccessCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.config = cls._create_config('product.template', usage_lines=[
+            cls._usage_line('sale.order.line', 'product_id'),
+        ])
+        cls.partner = cls.env['res.partner'].create({'name': 'Field Access Customer'})
+        cls.used_product, cls.free_product = cls.env['product.product'].create([
+            {'name': 'Field Access Used'},
+            {'name': 'Field Access Free'},
+        ])
+        cls.env['sale.order'].create({
+            'partner_id': cls.partner.id,
+            'order_line': [Command.create({'product_id': cls.used_product.id})],
+        })
+        cls._create_config('res.partner', usage_lines=[
+            cls._usage_line('sale.order', 'partner_id'),
+        ])
+
+    def test_usage_through_variants(self):
+        templates = (self.used_product | self.free_product).product_tmpl_id.with_user(self.user)
+        with self.assertRaises(UserError) as error:
+            templates.write({'description_sale': 'Field Access'})
+        self.assertIn(self.used_product.product_tmpl_id.display_name, str(error.exception))
+        self.assertNotIn(self.free_product.product_tmpl_id.display_name, str(error.exception))
+
+        self.free_product.product_tmpl_id.with_user(self.user).write({'description_sale': 'Field Access'})
+
+    def test_delegate_field_target(self):
+        usage = self.config.usage_model_ids
+        usage.delegate_field_id = self._field('product.product', 'product_tmpl_id')
+        with self.assertRaises(ValidationError):
+            # a many2one of product.product, but not linking to product templates
+            usage.delegate_field_id = self._field('product.product', 'categ_id')
+
+    def test_deferred_usage(self):
+        # failed checks stay registered until the test transaction is rolled back
+        self.addCleanup(self.env.cr.precommit.clear)
+        Config = self.env['field.access.config']
+        templates = (self.used_product | self.free_product).product_tmpl_id.with_user(self.user)
+        templates.with_context(field_access_defer=True).write({'description_sale': 'Field Access'})
+        self.partner.with_user(self.user).with_context(field_access_defer=True).write({'comment': 'Field Access'})
+
+        # the violations of all the models are reported together
+        with self.assertRaises(UserError) as error:
+            Config._field_access_checkpoint()
+        self.assertIn(self.env['product.template']._description, str(error.exception))
+        self.assertIn(self.env['res.partner']._description, str(error.exception))
+        self.assertIn(self.used_product.product_tmpl_id.display_name, str(error.exception))
+        self.assertNotIn(self.free_product.product_tmpl_id.display_name, str(error.exception))
+
+        # catching the error at a flush does not forget the violations
+        with suppress(UserError), self.env.cr.savepoint():
+            pass
+        with self.assertRaises(UserError):
+            Config._field_access_checkpoint()
+
+    def test_deferred_usage_passed(self):
+        template = self.free_product.product_tmpl_id.with_user(self.user)
+        template.with_context(field_access_defer=True).write({'description_sale': 'Field Access'})
+        self.env['field.access.config']._field_access_checkpoint()
+        self.assertFalse(self.env.cr.postcommit.data.get(DEFERRED_KEY))
+
+    def test_deferred_usage_rolled_back(self):
+        """Checks deferred in a rolled back savepoint are voided with its changes"""
+        template = self.used_product.product_tmpl_id.with_user(self.user)
+        with suppress(ZeroDivisionError), self.env.cr.savepoint():
+            template.with_context(field_access_defer=True).write({'description_sale': 'Field Access'})
+            1 / 0
+        self.env['field.access.config']._field_access_checkpoint()
+        self.assertFalse(self.env.cr.postcommit.data.get(DEFERRED_KEY))
+
+    def test_explain_access(self):
+        Config = self.env['field.access.config']
+        used, free = self.used_product.product_tmpl_id, self.free_product.product_tmpl_id
+        result = Config.explain_access([self.user.id, self.env.uid], 'product.template', (used | free).ids)
+
+        decisions = result[self.user.id]['records']
+        self.assertEqual(decisions[free.id], {'write': True, 'unlink': True, 'copy': True, 'blocking_usage': []})
+        self.assertEqual(decisions[used.id], {
+            'write': False, 'unlink': False, 'copy': False,
+            'blocking_usage': [{
+                'usage_id': self.config.usage_model_ids.id,
+                'usage_model': 'sale.order.line',
+                'operations': ['write', 'unlink', 'copy'],
+                'guarded_fields': [],
+                'count': 1,
+            }],
+        })
+        # system administrators are never affected
+        self.assertTrue(all(
+            decision['write'] and decision['unlink'] and decision['copy'] and not decision['blocking_usage']
+            for decision in result[self.env.uid]['records'].values()
+        ))
+
+        # users can only explain their own access
+        Config = Config.with_user(self.user)
+        own = Config.explain_access([self.user.id], 'product.template', (used | free).ids)
+        self.assertEqual(own[self.user.id], result[self.user.id])
+        with self.assertRaises(AccessError):
+            Config.explain_access([self.env.uid], 'product.template', used.ids)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test of the field access control enforcement.
+
+Starts N JSON-RPC clients against a running Odoo instance, each logged in as
+one of the given users, doing a weighted mix of form loads, writes, copies
+and unlinks on the given models. Reports throughput and p50/p95/p99 latency
+per operation, with the field access configurations enabled, disabled, or
+both (the configurations are archived and restored with the admin account).
+
+Example:
+
+    ./field_access_load_test.py --url http://localhost:8069 --db test \\
+        --admin admin:admin --user restricted:restricted --user manager:manager \\
+        --model product.template --model res.partner \\
+        --clients 32 --duration 60 --mode both --json report.json
+
+Only the Python standard library is required.
+"""
+import argparse
+import itertools
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+
+OPERATIONS = ('form', 'write', 'copy', 'unlink')
+
+
+class RpcError(Exception):
+    def __init__(self, error):
+        super().__init__(error.get('data', {}).get('message') or error.get('message'))
+        self.name = error.get('data', {}).get('name', '')
+
+
+class Client:
+    """Minimal JSON-RPC client of the Odoo external API"""
+    _ids = itertools.count()
+
+    def __init__(self, url, db, login, password):
+        self.url = url.rstrip('/') + '/jsonrpc'
+        self.db = db
+        self.password = password
+        self.uid = self.call('common', 'authenticate', db, login, password, {})
+        if not self.uid:
+            raise SystemExit('Authentication failed for %s' % login)
+
+    def call(self, service, method, *args):
+        payload = json.dumps({
+            'jsonrpc': '2.0', 'method': 'call', 'id': next(self._ids),
+            'params': {'service': service, 'method': method, 'args': args},
+        }).encode()
+        request = urllib.request.Request(self.url, payload, {'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=120) as response:
+            reply = json.load(response)
+        if reply.get('error'):
+            raise RpcError(reply['error'])
+        return reply['result']
+
+    def execute(self, model, method, *args, **kwargs):
+        return self.call('object', 'execute_kw', self.db, self.uid, self.password, model, method, args, kwargs)
+
+
+class Worker(threading.Thread):
+    """One simulated user doing random operations until the deadline"""
+
+    def __init__(self, client, models, weights, record_ids, deadline, results):
+        super().__init__(daemon=True)
+        self.client = client
+        self.models = models
+        self.weights = weights
+        self.record_ids = record_ids
+        self.deadline = deadline
+        self.results = results
+        self.copies = defaultdict(list)
+
+    def run(self):
+        while time.monotonic() < self.deadline:
+            model = random.choice(self.models)
+            operation = random.choices(OPERATIONS, self.weights)[0]
+            if operation == 'unlink' and not self.copies[model]:
+                operation = 'copy'
+            start = time.perf_counter()
+            status = 'ok'
+            try:
+                getattr(self, 'do_' + operation)(model)
+            except RpcError as error:
+                # restrictions raise UserError: the request was served normally
+                status = 'blocked' if error.name.endswith('UserError') else 'error'
+            except Exception:  # noqa: BLE001 - network errors are reported, not fatal
+                status = 'error'
+            self.results.append((operation, status, time.perf_counter() - start))
+
+    def do_form(self, model):
+        record_id = random.choice(self.record_ids[model])
+        self.client.execute(model, 'get_views', [[False, 'form']])
+        self.client.execute(model, 'web_read', [record_id], specification={'display_name': {}})
+
+    def do_write(self, model):
+        record_id = random.choice(self.record_ids[model])
+        field_name = 'description_sale' if model == 'product.template' else 'comment'
+        self.client.execute(model, 'write', [record_id], {field_name: 'load test %s' % time.time()})
+
+    def do_copy(self, model):
+        record_id = random.choice(self.record_ids[model])
+        self.copies[model].append(self.client.execute(model, 'copy', [record_id]))
+
+    def do_unlink(self, model):
+        self.client.execute(model, 'unlink', [self.copies[model].pop()])
+
+
+def percentile(values, percent):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+def run_phase(args, label):
+    users = [user.split(':', 1) for user in args.user]
+    clients = [Client(args.url, args.db, *users[index % len(users)]) for index in range(args.clients)]
+    record_ids = {
+        model: clients[0].execute(model, 'search', [], limit=args.records)
+        for model in args.model
+    }
+    for model, ids in record_ids.items():
+        if not ids:
+            raise SystemExit('No %s record readable by %s' % (model, users[0][0]))
+
+    results = []
+    deadline = time.monotonic() + args.duration
+    workers = [
+        Worker(client, args.model, args.weights, record_ids, deadline, results)
+        for client in clients
+    ]
+    start = time.monotonic()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - start
+
+    # remove the copies not unlinked during the run
+    for worker in workers:
+        for model, ids in worker.copies.items():
+            if ids:
+                try:
+                    worker.client.execute(model, 'unlink', ids)
+                except RpcError:
+                    pass
+
+    report = {'phase': label, 'clients': args.clients, 'seconds': round(elapsed, 2), 'operations': {}}
+    by_operation = defaultdict(list)
+    for operation, status, duration in results:
+        by_operation[operation].append((status, duration))
+    for operation, entries in sorted(by_operation.items()):
+        durations = sorted(duration * 1000 for _status, duration in entries)
+        report['operations'][operation] = {
+            'count': len(entries),
+            'throughput': round(len(entries) / elapsed, 2),
+            'blocked': sum(1 for status, _duration in entries if status == 'blocked'),
+            'errors': sum(1 for status, _duration in entries if status == 'error'),
+            'p50_ms': round(percentile(durations, 50), 2),
+            'p95_ms': round(percentile(durations, 95), 2),
+            'p99_ms': round(percentile(durations, 99), 2),
+        }
+    report['throughput'] = round(len(results) / elapsed, 2)
+    return report
+
+
+def set_configs_active(admin, config_ids, active):
+    if config_ids:
+        admin.execute('field.access.config', 'write', config_ids, {'active': active})
+
+
+def print_report(report):
+    print('\n[%s] %s clients, %ss, %s ops/s' % (
+        report['phase'], report['clients'], report['seconds'], report['throughput']))
+    print('%-8s %8s %9s %8s %7s %9s %9s %9s' % (
+        'op', 'count', 'ops/s', 'blocked', 'errors', 'p50 ms', 'p95 ms', 'p99 ms'))
+    for operation, stats in report['operations'].items():
+        print('%-8s %8d %9.2f %8d %7d %9.2f %9.2f %9.2f' % (
+            operation, stats['count'], stats['throughput'], stats['blocked'], stats['errors'],
+            stats['p50_ms'], stats['p95_ms'], stats['p99_ms']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8069')
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--admin', default='admin:admin',
+                        help='login:password of an administrator, to toggle the configurations')
+    parser.add_argument('--user', action='append', required=True,
+                        help='login:password of a simulated user, repeat for several policies')
+    parser.add_argument('--model', action='append', default=None,
+                        help='model to load (default: product.template and res.partner)')
+    parser.add_argument('--clients', type=int, default=16, help='number of concurrent clients')
+    parser.add_argument('--duration', type=int, default=30, help='seconds per phase')
+    parser.add_argument('--records', type=int, default=200, help='records sampled per model')
+    parser.add_argument('--mix', default='form=60,write=25,copy=10,unlink=5',
+                        help='weights of the operations')
+    parser.add_argument('--mode', choices=('on', 'off', 'both'), default='both',
+                        help='run with the configurations enabled, disabled, or both')
+    parser.add_argument('--json', help='also write the report to this JSON file')
+    args = parser.parse_args()
+
+    args.model = args.model or ['product.template', 'res.partner']
+    mix = dict(item.split('=') for item in args.mix.split(','))
+    args.weights = [float(mix.get(operation, 0)) for operation in OPERATIONS]
+
+    admin = Client(args.url, args.db, *args.admin.split(':', 1))
+    config_ids = admin.execute('field.access.config', 'search', [('active', '=', True)])
+
+    reports = []
+    try:
+        if args.mode in ('on', 'both'):
+            reports.append(run_phase(args, 'module on'))
+        if args.mode in ('off', 'both'):
+            set_configs_active(admin, config_ids, False)
+            reports.append(run_phase(args, 'module off'))
+    finally:
+        set_configs_active(admin, config_ids, True)
+
+    for report in reports:
+        print_report(report)
+    if args.json:
+        with open(args.json, 'w') as report_file:
+            json.dump(reports, report_file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())